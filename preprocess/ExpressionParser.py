@@ -0,0 +1,179 @@
+from GrammarProcess import OPERATOR_PRIORITY, copyNode, judge_node_type
+from SyntaxTree import Node
+
+EXP_FOLLOW = frozenset(
+    {")", ",", ";", "<", "=", "DO", "ELSE", "END", "ENDWH", "FI", "THEN", "]"}
+)
+VARIABLE_FOLLOW = EXP_FOLLOW | {"+", "-", "*", "/", ":="}
+# 表达式内部的二元运算符，比较运算符只出现在条件表达式中间
+ARITHMETIC = {op: OPERATOR_PRIORITY[op] for op in ("+", "-", "*", "/")}
+# 运算符栈中括号与下标的标记，优先级低于任何运算符，归约到此为止
+PAREN, INDEX = -1, -2
+
+
+class ExpressionError(Exception):
+    """表达式有误（只在递归下降分析中出现），需要改由LL1分析"""
+
+
+class ExpressionParser:
+    """优先级爬升表达式分析器
+
+    直接生成ExpK节点组成的表达式子树，写入语法树栈顶的占位节点，
+    不使用语法树上的操作数栈、操作符栈与END哨兵，也不需要expflag计数。
+    LL1在展开Exp与RelExp时记下起始Token，由符号栈确认表达式分析完毕后
+    调用本分析器一次生成整棵子树；递归下降分析器直接调用。
+
+    同级运算符左结合，优先级高的先归约。括号与数组下标不递归，而是在
+    运算符栈中压入标记，嵌套深度不受Python递归深度限制。
+    """
+
+    def __init__(self, tokens, types, tree):
+        self.tokens = tokens
+        self.types = types  # 每个Token的类型名
+        self.tree = tree
+        self.pos = 0
+
+    def parse(self, pos):
+        """分析Exp并写入语法树栈顶的占位节点，返回(占位节点, 下一个Token位置)"""
+        self.pos = pos
+        value = self._expression()
+        if self.types[self.pos] not in EXP_FOLLOW:
+            raise ExpressionError
+        return self._commit(value), self.pos
+
+    def parse_relation(self, pos):
+        """分析RelExp（Exp CmpOp Exp），返回值同parse"""
+        self.pos = pos
+        left = self._expression()
+        if self.types[self.pos] not in ("<", "="):
+            raise ExpressionError
+        op = self._leaf(self.pos)
+        self.pos += 1
+        right = self._expression()
+        if self.types[self.pos] not in EXP_FOLLOW:
+            raise ExpressionError
+        op.child.extend((left, right))
+        return self._commit(op), self.pos
+
+    def variable_more(self, pos, node):
+        """赋值语句左侧变量的VariMore部分，返回下一个Token位置"""
+        self.pos = pos
+        target = self._variable_more(node)
+        if target is not None:
+            # 左侧变量的下标是独立的表达式，到"]"结束
+            target.child.append(self._expression())
+            if self.types[self.pos] != "]":
+                raise ExpressionError
+            self.pos += 1
+        return self.pos
+
+    def _commit(self, value):
+        # 结果复制到占位节点
+        placeholder = self.tree.stack.pop()
+        copyNode(placeholder, value)
+        return placeholder
+
+    def _leaf(self, pos):
+        # 常量、运算符节点
+        lexeme = self.tokens.lexeme(pos)
+        node = Node("ExpK", self.tokens.lines[pos], judge=True)
+        node.name.append(lexeme)
+        node.idnum = 1
+        node.exp = judge_node_type(lexeme)
+        return node
+
+    def _expression(self):
+        # 分析一个Exp，返回子树的根；self.pos停在表达式之后的Token
+        types = self.types
+        operands = []
+        # 元素为(优先级, 节点)：运算符节点，或括号、下标标记（下标的节点
+        # 为下标所属的变量节点）
+        operators = []
+        while True:
+            # 操作数：左括号与下标只压入标记，随后继续分析其中的操作数
+            look = types[self.pos]
+            if look == "(":
+                operators.append((PAREN, None))
+                self.pos += 1
+                continue
+            if look == "INTC" or look == "CHARC":
+                operands.append(self._leaf(self.pos))
+                self.pos += 1
+            elif look == "ID":
+                node = Node("ExpK", self.tokens.lines[self.pos], judge=True)
+                node.name.append(self.tokens.lexeme(self.pos))
+                node.idnum = 1
+                self.pos += 1
+                operands.append(node)
+                target = self._variable_more(node)
+                if target is not None:
+                    operators.append((INDEX, target))
+                    continue
+            else:
+                raise ExpressionError
+
+            # 操作数之后：运算符，或右括号、下标结束，或表达式结束
+            while True:
+                look = types[self.pos]
+                priority = ARITHMETIC.get(look)
+                if priority is not None:
+                    self._reduce(operands, operators, priority)
+                    operators.append((priority, self._leaf(self.pos)))
+                    self.pos += 1
+                    break
+                self._reduce(operands, operators, 0)
+                if not operators:
+                    return operands.pop()
+                marker, target = operators[-1]
+                if look == ")" and marker == PAREN:
+                    operators.pop()
+                elif look == "]" and marker == INDEX:
+                    operators.pop()
+                    target.child.append(operands.pop())
+                else:
+                    raise ExpressionError
+                self.pos += 1
+
+    @staticmethod
+    def _reduce(operands, operators, priority):
+        # 归约栈顶优先级不低于priority的运算符（同级左结合），遇到标记停止
+        while operators and operators[-1][0] >= priority:
+            op = operators.pop()[1]
+            right = operands.pop()
+            op.child.extend((operands.pop(), right))
+            operands.append(op)
+
+    def _variable_more(self, node):
+        # VariMore ::= NULL | [ Exp ] | . FieldVar
+        # 返回等待下标表达式的节点（node或其字段节点），没有下标时为None
+        look = self.types[self.pos]
+        node.exp = "IdK"
+        if look in VARIABLE_FOLLOW:
+            node.varkind = "IdV"
+            return None
+        if look == "[":
+            node.varkind = "ArrayMembV"
+            self.pos += 1
+            return node
+        if look != ".":
+            raise ExpressionError
+        node.varkind = "FieldMembV"
+        self.pos += 1
+        if self.types[self.pos] != "ID":
+            raise ExpressionError
+        # FieldVar ::= ID FieldVarMore
+        field = Node("ExpK", self.tokens.lines[self.pos], judge=True)
+        field.name.append(self.tokens.lexeme(self.pos))
+        field.idnum = 1
+        field.exp = "IdK"
+        node.child.append(field)
+        self.pos += 1
+        look = self.types[self.pos]
+        if look in VARIABLE_FOLLOW:
+            field.varkind = "IdV"
+            return None
+        if look == "[":
+            field.varkind = "ArrayMembV"
+            self.pos += 1
+            return field
+        raise ExpressionError
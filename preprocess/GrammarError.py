@@ -1,5 +1,9 @@
-import copy
 import sys
+from array import array
+from bisect import bisect_left
+
+from SyntaxTree import StackView
+from TokenStore import BACK
 
 
 def handle_index_error(exc_type, exc_value, exc_traceback):
@@ -11,15 +15,78 @@ def handle_index_error(exc_type, exc_value, exc_traceback):
 
 sys.excepthook = handle_index_error
 
+# 错误诊断统计个数的Token类型与检测的相邻Token模式
+COUNTED_TYPES = (
+    "BEGIN",
+    "END",
+    "IF",
+    "FI",
+    "WHILE",
+    "ENDWH",
+    "RECORD",
+    "(",
+    ")",
+    "[",
+    "]",
+    "PROCEDURE",
+    "ARRAY",
+    "OF",
+)
+PATTERNS = ("range", "assign", "then")
+
+
+def match_patterns(types, i):
+    """types[i]起始的相邻Token模式"""
+    token_type = types[i]
+    if token_type == "INTC":
+        if i + 2 < len(types) and types[i + 1] == "." and types[i + 2] == "INTC":
+            yield "range"  # 数组下标范围误用"."
+    elif token_type == "ID":
+        if i + 1 < len(types) and types[i + 1] == "=":
+            yield "assign"  # 赋值误用"="
+    elif token_type == "IF":
+        if i + 1 < len(types) and types[i + 1] > "THEN":
+            yield "then"  # IF后紧跟的Token类型按字符串比较大于THEN
+
+
+class TokenCounter:
+    """输入中各Token类型与模式出现位置的有序索引
+
+    剩余输入是从游标位置开始的后缀，其中某类型的个数与某模式是否出现
+    都只需二分查找；索引在首次诊断时建立一次，之后每次诊断与剩余长度无关。
+    """
+
+    def __init__(self, tokens, end):
+        self.end = end
+        type_names = tokens.type_names
+        types = [type_names[type_id] for type_id in tokens.type_ids[:end]]
+        self.positions = {token_type: array("I") for token_type in COUNTED_TYPES}
+        self.pattern_starts = {key: array("I") for key in PATTERNS}
+        for idx, token_type in enumerate(types):
+            positions = self.positions.get(token_type)
+            if positions is not None:
+                positions.append(idx)
+            for key in match_patterns(types, idx):
+                self.pattern_starts[key].append(idx)
+
+    def counts(self, pos):
+        return {
+            token_type: len(positions) - bisect_left(positions, pos)
+            for token_type, positions in self.positions.items()
+        }
+
+    def has(self, key, pos):
+        starts = self.pattern_starts[key]
+        return len(starts) > 0 and starts[-1] >= pos
+
 
 class dealError:
 
-    def __init__(self, non_terminals, non_term_map, predict_table, grammar):
+    def __init__(self, tables, tokens):
         # 初始化错误处理类，存储语法分析所需的关键信息
-        self.non_terminals = non_terminals  # 非终结符集合
-        self.non_term_map = non_term_map  # 非终结符到预测表索引的映射
-        self.predict_table = predict_table  # LL(1)预测分析表
-        self.grammar = grammar  # 文法规则
+        self.tables = tables  # 文法分析结果：符号编号与稠密LL(1)分析表
+        self.nt_count = tables.nt_count  # 编号小于此值的符号为非终结符
+        self.tokens = tokens  # Token存储，栈中元素为其下标
         self.reservedWords = [  # 语言保留字列表
             "PROGRAM",
             "TYPE",
@@ -60,37 +127,64 @@ class dealError:
             "(",
             ")",
         ]
+        self.inserted = None
+        self.counter = None
 
-    def _get_token_type(self, token_entry):
-        # 辅助方法：从token条目中提取有效类型
-        token_type = token_entry[1]
-        # 特殊处理标识符和字面量类型
-        if token_type in {"ID", "INTC", "CHARC"}:
-            return token_type
-        return token_entry[2]  # 其他类型直接返回第三元素
+    def _prepare_inserted(self):
+        # 修复时插入的Token在首次出错时存入存储，之后尝试插入只需压入其下标
+        self.inserted = {}
+        for word in self.reservedWords:
+            self.inserted[word] = self.tokens.append(0, "Reserved_word", word)
+        for delimiter in self.delimiters:
+            self.inserted[delimiter] = self.tokens.append(0, "Other", delimiter)
+        self.inserted_const = self.tokens.append(0, "INTC", "error")
+        # 插入的Token类型都已在转换表建立前登记
+        self.token_columns = self.tables.token_columns(self.tokens.type_names)
+
+    def _get_token_type(self, token):
+        # 辅助方法：从Token存储中取出有效类型
+        return self.tokens.type_names[self.tokens.type_ids[token]]
+
+    def _lookup(self, sign, column, token):
+        # 查分析表；不属于文法终结符的Token类型无法查表
+        if column < 0:
+            raise KeyError(self._get_token_type(token))
+        return self.tables.table[sign * self.tables.width + column]
+
+    def _viable(self, SignStack, candidates):
+        # 按原顺序保留可能通过首步验证的候选：插入的终结符须属于栈顶符号的
+        # 预期集合（非终结符为其PREDICT之并，终结符为其自身），其余候选
+        # 在__judgeRepair2的第一步必然失败，无需模拟
+        if SignStack.isEmpty():
+            return candidates
+        sign = SignStack.top()
+        if sign < self.nt_count:
+            expected = self.tables.expected[sign]
+        else:
+            expected = (sign - self.nt_count,)
+        columns = self.tables.columns
+        return [c for c in candidates if columns[c] in expected]
 
     def __judgeRepair2(self, SignStack, TokenStack):
         # 核心预测分析验证方法：模拟分析过程判断修复是否可行
+        # SignStack与TokenStack为可随意修改的视图，模拟代价只与步数有关
         steps = 10  # 最大验证步数防止无限循环
         while not SignStack.isEmpty() and steps > 0:
             sign = SignStack.top()
-            token = self._get_token_type(TokenStack.top())
+            token = TokenStack.top()
+            column = self.token_columns[self.tokens.type_ids[token]]
 
-            if sign in self.non_terminals:
+            if sign < self.nt_count:
                 # 处理非终结符：检查预测表并展开产生式
-                if self.predict_table[self.non_term_map[sign]][token] == -1:
+                production_id = self._lookup(sign, column, token)
+                if production_id == -1:
                     return False
                 SignStack.pop()
-                # 获取对应产生式并逆序压栈
-                production = self.grammar[
-                    self.predict_table[self.non_term_map[sign]][token]
-                ]["right"]
-                for symbol in reversed(production):
-                    if symbol != "NULL":
-                        SignStack.push(symbol)
+                # 对应产生式已按逆序编码
+                SignStack.extend(self.tables.push_symbols[production_id])
             else:
                 # 处理终结符：必须严格匹配
-                if sign != token:
+                if sign != self.nt_count + column:
                     return False
                 SignStack.pop()
                 TokenStack.pop()
@@ -99,11 +193,12 @@ class dealError:
 
     def __judgeRepair(self, sign, token):
         # 快速判断当前符号与token是否匹配
-        if sign in self.non_terminals:
+        column = self.token_columns[self.tokens.type_ids[token]]
+        if sign < self.nt_count:
             # 非终结符：检查预测表中是否存在有效产生式
-            return self.predict_table[self.non_term_map[sign]][token] != -1
+            return self._lookup(sign, column, token) != -1
         # 终结符：直接比较类型
-        return sign == token
+        return sign == self.nt_count + column
 
     def run(
         self,
@@ -115,6 +210,8 @@ class dealError:
     ):
         # 错误处理主入口：依次尝试四种修复策略
         ErrInfo = " "
+        if self.inserted is None:
+            self._prepare_inserted()
         # 保存分析过程的状态信息用于可能的回溯
         self.sign_push_history = sign_push_history
         self.prod_length_stack = prod_length_stack
@@ -137,76 +234,74 @@ class dealError:
                 return True, ErrInfo
 
         # 所有修复失败后执行错误诊断
-        tmptokenstack = copy.deepcopy(TokenStack)
-        ErrInfo = self._diagnose_remaining_errors(tmptokenstack)
+        ErrInfo = self._diagnose_remaining_errors(TokenStack)
         return False, ErrInfo
 
     def _diagnose_remaining_errors(self, token_stack):
-        tmp_stack = copy.deepcopy(token_stack)
-        recent_tokens = []
-        # 收集最近的5个token，按从最近到最早的顺序
-        for _ in range(token_stack.size()):
-            if tmp_stack.isEmpty():
-                break
-            token_entry = tmp_stack.pop()
-            token_type = self._get_token_type(token_entry)
-            recent_tokens.append(token_type)  # 最近的token在列表前端
+        # 统计剩余Token（覆盖栈中的Token在前，随后是游标之后的输入）：
+        # 覆盖栈与紧随其后的两个Token直接检查，其余部分查位置索引
+        if self.counter is None or self.counter.end != token_stack.end:
+            self.counter = TokenCounter(self.tokens, token_stack.end)
+        pos = token_stack.pos
+        head = [
+            self._get_token_type(token) for token in reversed(token_stack.overlay)
+        ]
+        head += [
+            self.tokens.type_of(idx) for idx in range(pos, min(pos + 2, token_stack.end))
+        ]
+        counts = self.counter.counts(pos)
+        for token_type in head[: len(token_stack.overlay)]:
+            if token_type in counts:
+                counts[token_type] += 1
+        found = {key for i in range(len(head)) for key in match_patterns(head, i)}
+        found.update(key for key in PATTERNS if self.counter.has(key, pos))
 
         # 模式1：检测数组下标范围错误（结构错误，保持原逻辑）
-        for i in range(len(recent_tokens) - 2):
-            if (
-                recent_tokens[i] == "INTC"
-                and recent_tokens[i + 1] == "."
-                and recent_tokens[i + 2] == "INTC"
-            ):
-                return '及以后的语句至少存在数组下标范围错误，应使用".."分隔符'
+        if "range" in found:
+            return '及以后的语句至少存在数组下标范围错误，应使用".."分隔符'
 
         # 模式2：BEGIN未闭合（数量判断）
-        begin_count = recent_tokens.count("BEGIN")
-        end_count = recent_tokens.count("END")
+        begin_count = counts["BEGIN"]
+        end_count = counts["END"]
         if begin_count > end_count:
             return '及以后的语句至少存在代码块缺少"END"'
 
         # 模式3：IF未闭合（数量判断）
-        if recent_tokens.count("IF") > recent_tokens.count("FI"):
+        if counts["IF"] > counts["FI"]:
             return '及以后的语句至少存在IF语句缺少闭合关键字"FI"'
 
         # 模式4：WHILE未闭合（数量判断）
-        if recent_tokens.count("WHILE") > recent_tokens.count("ENDWH"):
+        if counts["WHILE"] > counts["ENDWH"]:
             return '及以后的语句至少存在WHILE循环缺少闭合关键字"ENDWH"'
 
         # 模式5：RECORD未闭合（考虑BEGIN和RECORD的END分配）
-        record_count = recent_tokens.count("RECORD")
+        record_count = counts["RECORD"]
         if record_count > 0:
             available_ends = end_count - begin_count
             if record_count > available_ends:
                 return '及以后的语句至少存在RECORD声明缺少"END"'
 
         # 模式6：括号未闭合（数量判断）
-        if recent_tokens.count("(") > recent_tokens.count(")"):
+        if counts["("] > counts[")"]:
             return '及以后的语句至少存在括号未闭合，缺少")"'
-        if recent_tokens.count("[") > recent_tokens.count("]"):
+        if counts["["] > counts["]"]:
             return '及以后的语句至少存在数组下标未闭合，缺少"]"'
 
         # 模式7：赋值符误用（结构错误，保持原逻辑）
-        for i in range(len(recent_tokens) - 1):
-            if recent_tokens[i] == "ID" and recent_tokens[i + 1] == "=":
-                return '及以后的语句至少存在赋值语句应使用":="而非"="'
+        if "assign" in found:
+            return '及以后的语句至少存在赋值语句应使用":="而非"="'
 
         # 模式8：过程参数括号闭合（数量判断）
-        if "PROCEDURE" in recent_tokens and recent_tokens.count(
-            "("
-        ) > recent_tokens.count(")"):
+        if counts["PROCEDURE"] > 0 and counts["("] > counts[")"]:
             return '及以后的语句至少存在过程参数列表缺少闭合括号")"'
 
         # 模式9：数组声明缺少OF（数量判断）
-        if recent_tokens.count("ARRAY") > recent_tokens.count("OF"):
+        if counts["ARRAY"] > counts["OF"]:
             return '及以后的语句至少存在数组声明缺少"OF"关键字'
 
         # 模式10：IF后缺少THEN（结构错误，保持原逻辑）
-        for i in range(len(recent_tokens) - 1):
-            if recent_tokens[i] == "IF" and recent_tokens[i + 1] > "THEN":
-                return '及以后的语句至少存在IF语句缺少"THEN"分支'
+        if "then" in found:
+            return '及以后的语句至少存在IF语句缺少"THEN"分支'
 
         # 默认未知错误
         return "及以后的语句存在无法识别的语法错误"
@@ -223,19 +318,19 @@ class dealError:
 
     def __error1(self, SignStack, TokenStack):
         # 修复策略1：尝试插入保留字
-        for word in self.reservedWords:
-            test_stack = copy.deepcopy(TokenStack)
-            test_stack.push(["0", "Reserved_word", word])  # 模拟插入保留字
+        for word in self._viable(SignStack, self.reservedWords):
+            test_stack = TokenStack.fork()
+            test_stack.push(self.inserted[word])  # 模拟插入保留字
             # 验证插入后能否继续分析
-            if self.__judgeRepair2(copy.deepcopy(SignStack), test_stack):
-                TokenStack.push(["0", "Reserved_word", word])
+            if self.__judgeRepair2(StackView(SignStack), test_stack):
+                TokenStack.push(self.inserted[word])
                 return True, f"缺少保留字{word}"
         return False, " "
 
     def __error2(self, SignStack, TokenStack):
         # 修复策略2：插入缺省常量
-        if self.__judgeRepair(self.sign, "INTC"):
-            TokenStack.push(["0", "INTC", "error"])  # 插入伪常量
+        if self.__judgeRepair(self.sign, self.inserted_const):
+            TokenStack.push(self.inserted_const)  # 插入伪常量
             return True, "缺少常量"
         return False, " "
 
@@ -247,7 +342,7 @@ class dealError:
             "DEFAULT": self.delimiters,  # 默认尝试所有
         }
 
-        tmp_stack = copy.deepcopy(TokenStack)
+        tmp_stack = TokenStack.fork()
         recent_tokens = []
         # 收集最近的5个token，按从最近到最早的顺序
         for _ in range(5):
@@ -267,68 +362,69 @@ class dealError:
             expected_delimiter = context_delimiters["PARAM_LIST"]
 
         # 优先插入上下文所需分隔符
-        if expected_delimiter:
-            test_stack = copy.deepcopy(TokenStack)
-            test_stack.push(["0", "Other", expected_delimiter])  # 模拟插入分隔符
-            if self.__judgeRepair2(copy.deepcopy(SignStack), test_stack):
-                TokenStack.push(["0", "Other", expected_delimiter])
+        if expected_delimiter and self._viable(SignStack, [expected_delimiter]):
+            test_stack = TokenStack.fork()
+            test_stack.push(self.inserted[expected_delimiter])  # 模拟插入分隔符
+            if self.__judgeRepair2(StackView(SignStack), test_stack):
+                TokenStack.push(self.inserted[expected_delimiter])
                 return True, f"缺少符号{expected_delimiter}"
 
         # 修复策略3：尝试插入分隔符
-        for delimiter in self.delimiters:
-            test_stack = copy.deepcopy(TokenStack)
-            test_stack.push(["0", "Other", delimiter])  # 模拟插入分隔符
-            if self.__judgeRepair2(copy.deepcopy(SignStack), test_stack):
-                TokenStack.push(["0", "Other", delimiter])
+        for delimiter in self._viable(SignStack, self.delimiters):
+            test_stack = TokenStack.fork()
+            test_stack.push(self.inserted[delimiter])  # 模拟插入分隔符
+            if self.__judgeRepair2(StackView(SignStack), test_stack):
+                TokenStack.push(self.inserted[delimiter])
                 return True, f"缺少符号{delimiter}"
         return False, " "
 
     def __error4(self, SignStack, TokenStack):
         # 修复策略4：回溯分析栈并尝试插入保留字
-        sign_push_history = copy.deepcopy(self.sign_push_history)
-        prod_length_stack = copy.deepcopy(self.prod_length_stack)
-        token_back_stack = copy.deepcopy(self.token_back_stack)
-        tmpsignstack = copy.deepcopy(SignStack)
-        tmptokenstack = copy.deepcopy(TokenStack)
+        # 三个历史栈同步增长，按下标从栈顶向下读取，不复制
+        sign_push_history = self.sign_push_history.items
+        prod_length_stack = self.prod_length_stack.items
+        token_back_stack = self.token_back_stack.items
+        tmpsignstack = StackView(SignStack)
+        tmptokenstack = TokenStack.fork()
 
         # 最多回溯10步
-        backtrack_steps = min(sign_push_history.size(), 10)
+        backtrack_steps = min(len(sign_push_history), 10)
         for x in range(backtrack_steps):
             # 恢复历史状态
-            pops = prod_length_stack.pop()  # 获取需要弹出的符号数量
+            pops = prod_length_stack[-1 - x]  # 获取需要弹出的符号数量
             for _ in range(pops):
                 tmpsignstack.pop()
-            tmpsignstack.push(sign_push_history.pop())  # 恢复压栈历史
-            token = token_back_stack.pop()  # 恢复token历史
-            if token[1] != "back":
+            tmpsignstack.push(sign_push_history[-1 - x])  # 恢复压栈历史
+            token = token_back_stack[-1 - x]  # 恢复token历史
+            if token != BACK:
                 tmptokenstack.push(token)  # 重新压入之前弹出的token
             # 尝试每个保留字
-            for word in self.reservedWords:
-                test_sign = copy.deepcopy(tmpsignstack)
-                test_token = copy.deepcopy(tmptokenstack)
-                test_token.push(["0", "Reserved_word", word])
+            for word in self._viable(tmpsignstack, self.reservedWords):
+                test_sign = tmpsignstack.fork()
+                test_token = tmptokenstack.fork()
+                test_token.push(self.inserted[word])
                 if self.__judgeRepair2(test_sign, test_token):
                     for _ in range(x + 1):
                         for _ in range(self.prod_length_stack.pop()):
                             SignStack.pop()
                         SignStack.push(self.sign_push_history.pop())
                         token = self.token_back_stack.pop()
-                        if token[1] != "back":
+                        if token != BACK:
                             TokenStack.push(token)
-                    TokenStack.push(["0", "Reserved_word", word])
+                    TokenStack.push(self.inserted[word])
                     return True, f"缺少保留字{word}"
         return False, " "
 
     def __error5(self, SignStack, TokenStack):
         # 修复策略5：删除不匹配的冗余符号
-        test_stack = copy.deepcopy(TokenStack)
+        test_stack = TokenStack.fork()
         if test_stack.isEmpty():
             return False, " "
 
         # 尝试删除当前token并验证是否可行
         deleted_token = test_stack.pop()
-        if self.__judgeRepair2(copy.deepcopy(SignStack), test_stack):
+        if self.__judgeRepair2(StackView(SignStack), test_stack):
             # 确认删除有效后更新原始栈
             TokenStack.pop()
-            return True, f"多余符号{deleted_token[2]}"
+            return True, f"多余符号{self.tokens.lexeme(deleted_token)}"
         return False, " "
@@ -12,10 +12,8 @@ def handle_index_error(exc_type, exc_value, exc_traceback):
 sys.excepthook = handle_index_error
 
 
-def get_priority(op: str) -> int:
-    """获取操作符优先级"""
-    priority_map = {"END": 0, "<": 1, "=": 1, "+": 2, "-": 2, "*": 3, "/": 3}
-    return priority_map.get(op, -1)
+# 操作符优先级
+OPERATOR_PRIORITY = {"<": 1, "=": 1, "+": 2, "-": 2, "*": 3, "/": 3}
 
 
 def judge_node_type(token: str) -> str:
@@ -33,11 +31,17 @@ def copyNode(x, y):
     x.child = y.child
     x.Sibling = y.Sibling
     x.Lineno = y.Lineno
-    x.kind = y.kind
+    x.dec = y.dec
+    x.stmt = y.stmt
+    x.exp = y.exp
     x.idnum = y.idnum  # 一个节点中的标识符的个数
     x.name = y.name
-    x.attr = y.attr
     x.judge = y.judge
+    x.low = y.low
+    x.up = y.up
+    x.childType = y.childType
+    x.paramt = y.paramt
+    x.varkind = y.varkind
 
 
 def process1(Tree, currentToken, preNode):
@@ -116,25 +120,25 @@ def process13(Tree, currentToken, preNode):
 
 
 def process14(Tree, currentToken, preNode):
-    preNode.kind["dec"] = "IdK"
+    preNode.dec = "IdK"
     preNode.name.append(str(currentToken[2]))
     preNode.idnum += 1
     return preNode
 
 
 def process15(Tree, currentToken, preNode):
-    if preNode.kind["dec"] == "ArrayK":
-        preNode.attr[0]["childType"] = "IntegerK"
+    if preNode.dec == "ArrayK":
+        preNode.childType = "IntegerK"
     else:
-        preNode.kind["dec"] = "IntegerK"
+        preNode.dec = "IntegerK"
     return preNode
 
 
 def process16(Tree, currentToken, preNode):
-    if preNode.kind["dec"] == "ArrayK":
-        preNode.attr[0]["childType"] = "CharK"
+    if preNode.dec == "ArrayK":
+        preNode.childType = "CharK"
     else:
-        preNode.kind["dec"] = "CharK"
+        preNode.dec = "CharK"
     return preNode
 
 
@@ -147,22 +151,22 @@ def process18(Tree, currentToken, preNode):
 
 
 def process19(Tree, currentToken, preNode):
-    preNode.kind["dec"] = "ArrayK"
+    preNode.dec = "ArrayK"
     return preNode
 
 
 def process20(Tree, currentToken, preNode):
-    preNode.attr[0]["low"] = currentToken[2]
+    preNode.low = currentToken[2]
     return preNode
 
 
 def process21(Tree, currentToken, preNode):
-    preNode.attr[0]["up"] = currentToken[2]
+    preNode.up = currentToken[2]
     return preNode
 
 
 def process22(Tree, currentToken, preNode):
-    preNode.kind["dec"] = "RecordK"
+    preNode.dec = "RecordK"
     preNode.Lineno = currentToken[0]
     preNode.child.append(Node("DecK"))
     Tree.stack.push(preNode)
@@ -281,6 +285,8 @@ def process40(Tree, currentToken, preNode):
 
 def process41(Tree, currentToken, preNode):
     ProcDecK = Tree.stack.pop()
+    # 语法树栈中只剩主程序的语句序列时，为最外层的过程声明
+    outermost = Tree.stack.items == [Tree.body]
     if ProcDecK == "VarK":
         ProcDecK.Sibling = Node("ProcDecK")
         ProcDecK = ProcDecK.Sibling
@@ -305,6 +311,8 @@ def process41(Tree, currentToken, preNode):
     Tree.stack.push(ProcDecK.child[2])
     Tree.stack.push(ProcDecK.child[1])
     Tree.stack.push(ProcDecK.child[0])
+    if outermost:
+        Tree.emitBefore(ProcDecK)
     return ProcDecK
 
 
@@ -348,7 +356,7 @@ def process50(Tree, currentToken, preNode):
     DecK = Tree.stack.pop()
     DecK.Lineno = currentToken[0]
     DecK.judge = True
-    DecK.attr[1]["paramt"] = "valparamType"
+    DecK.paramt = "valparamType"
     DecK.Sibling = Node("DecK")
     Tree.stack.push(DecK.Sibling)
     return DecK
@@ -358,7 +366,7 @@ def process51(Tree, currentToken, preNode):
     DecK = Tree.stack.pop()
     DecK.Lineno = currentToken[0]
     DecK.judge = True
-    DecK.attr[1]["paramt"] = "varparamType"
+    DecK.paramt = "varparamType"
     DecK.Sibling = Node("DecK")
     Tree.stack.push(DecK.Sibling)
     return DecK
@@ -413,7 +421,7 @@ def process61(Tree, currentToken, preNode):
     StmtK = Tree.stack.pop()
     StmtK.Lineno = currentToken[0]
     StmtK.judge = True
-    StmtK.kind["stmt"] = "IfK"
+    StmtK.stmt = "IfK"
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
@@ -423,7 +431,7 @@ def process62(Tree, currentToken, preNode):
     StmtK = Tree.stack.pop()
     StmtK.Lineno = currentToken[0]
     StmtK.judge = True
-    StmtK.kind["stmt"] = "WhileK"
+    StmtK.stmt = "WhileK"
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
@@ -433,7 +441,7 @@ def process63(Tree, currentToken, preNode):
     StmtK = Tree.stack.pop()
     StmtK.Lineno = currentToken[0]
     StmtK.judge = True
-    StmtK.kind["stmt"] = "ReadK"
+    StmtK.stmt = "ReadK"
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
@@ -443,7 +451,7 @@ def process64(Tree, currentToken, preNode):
     StmtK = Tree.stack.pop()
     StmtK.Lineno = currentToken[0]
     StmtK.judge = True
-    StmtK.kind["stmt"] = "WriteK"
+    StmtK.stmt = "WriteK"
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
@@ -453,7 +461,7 @@ def process65(Tree, currentToken, preNode):
     StmtK = Tree.stack.pop()
     StmtK.Lineno = currentToken[0]
     StmtK.judge = True
-    StmtK.kind["stmt"] = "ReturnK"
+    StmtK.stmt = "ReturnK"
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
@@ -468,22 +476,22 @@ def process66(Tree, currentToken, preNode):
     StmtK.child[0].Lineno = currentToken[0]
     StmtK.child[0].idnum += 1
     StmtK.child[0].judge = True
-    StmtK.child[0].kind["exp"] = judge_node_type(currentToken[2])
+    StmtK.child[0].exp = judge_node_type(currentToken[2])
     StmtK.Sibling = Node("StmtK")
     Tree.stack.push(StmtK.Sibling)
     return StmtK
 
 
 def process67(Tree, currentToken, preNode):
-    preNode.kind["stmt"] = "AssignK"
+    preNode.stmt = "AssignK"
     return preNode
 
 
 def process68(Tree, currentToken, preNode):
-    preNode.kind["stmt"] = "CallK"
+    preNode.stmt = "CallK"
     preNode.name.append(preNode.child[0].name[0])
     preNode.idnum += 1
-    preNode.child[0].attr[2]["varkind"] = "IdV"
+    preNode.child[0].varkind = "IdV"
     preNode.child[0].judge = False
     return preNode
 
@@ -491,9 +499,6 @@ def process68(Tree, currentToken, preNode):
 def process69(Tree, currentToken, preNode):
     preNode.child.append(Node("ExpK"))
     Tree.stack.push(preNode.child[1])
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
     return preNode.child[0]
 
 
@@ -528,9 +533,6 @@ def process73(Tree, currentToken, preNode):
 def process74(Tree, currentToken, preNode):
     preNode.child.append(Node("ExpK"))
     Tree.stack.push(preNode.child[0])
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
     return preNode
 
 
@@ -550,9 +552,6 @@ def process77(Tree, currentToken, preNode):
 
 
 def process78(Tree, currentToken, preNode):
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
     return preNode
 
 
@@ -566,36 +565,14 @@ def process80(Tree, currentToken, preNode):
     return preNode
 
 
+# 表达式（Exp、RelExp）内部的产生式：分析器在表达式分析完毕后由
+# ExpressionParser一次生成整棵子树，写入语法树栈顶的占位节点，这些动作为空
 def process81(Tree, currentToken, preNode):
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
-    Tree.getExpResult = False
-    return preNode
-
-
-def process82(Tree, currentToken, preNode):  # ???//????/
-    currentP = Node("ExpK")
-    currentP.name.append(currentToken[2])
-    currentP.Lineno = currentToken[0]
-    currentP.idnum += 1
-    currentP.judge = True
-    currentP.kind["exp"] = judge_node_type(currentToken[2])
-    while len(Tree.SignStack.items) != 0 and get_priority(
-        Tree.SignStack.top().name[0]
-    ) >= get_priority(currentP.name[0]):
-        t = Tree.SignStack.pop()
-        Rnum = Tree.NumStack.pop()
-        Lnum = Tree.NumStack.pop()
-        t.judge = True
-        Lnum.judge = True
-        Rnum.judge = True
-        t.child.append(Lnum)
-        t.child.append(Rnum)
-        Tree.NumStack.push(t)
-    Tree.SignStack.push(currentP)
-    Tree.getExpResult = True
-    return currentP
+    return preNode
+
+
+def process82(Tree, currentToken, preNode):
+    return preNode
 
 
 def process83(Tree, currentToken, preNode):
@@ -603,61 +580,11 @@ def process83(Tree, currentToken, preNode):
 
 
 def process84(Tree, currentToken, preNode):
-    if currentToken[2] == ")" and Tree.expflag != 0:
-        while Tree.SignStack.top().name[0] != "(":
-            t = Tree.SignStack.pop()
-            Rnum = Tree.NumStack.pop()
-            Lnum = Tree.NumStack.pop()
-            t.judge = True
-            Lnum.judge = True
-            Rnum.judge = True
-            t.child.append(Lnum)
-            t.child.append(Rnum)
-            Tree.NumStack.push(t)
-        Tree.SignStack.pop()
-        Tree.expflag -= 1
-    else:
-        if Tree.getExpResult or Tree.getExpResult2:
-            while Tree.SignStack.top().name[0] != "END":
-                t = Tree.SignStack.pop()
-                Rnum = Tree.NumStack.pop()
-                Lnum = Tree.NumStack.pop()
-                t.judge = True
-                Lnum.judge = True
-                Rnum.judge = True
-                t.child.append(Lnum)
-                t.child.append(Rnum)
-                Tree.NumStack.push(t)
-            Tree.SignStack.pop()
-            currentP = Tree.stack.pop()
-            t1 = Tree.NumStack.pop()
-            copyNode(currentP, t1)
-            Tree.getExpResult2 = False
-            preNode = currentP
     return preNode
 
 
 def process85(Tree, currentToken, preNode):
-    currentP = Node("ExpK")
-    currentP.name.append(currentToken[2])
-    currentP.Lineno = currentToken[0]
-    currentP.idnum += 1
-    currentP.judge = True
-    currentP.kind["exp"] = judge_node_type(currentToken[2])
-    while len(Tree.SignStack.items) != 0 and get_priority(
-        Tree.SignStack.top().name[0]
-    ) >= get_priority(currentP.name[0]):
-        t = Tree.SignStack.pop()
-        Rnum = Tree.NumStack.pop()
-        Lnum = Tree.NumStack.pop()
-        t.judge = True
-        Lnum.judge = True
-        Rnum.judge = True
-        t.child.append(Lnum)
-        t.child.append(Rnum)
-        Tree.NumStack.push(t)
-    Tree.SignStack.push(currentP)
-    return currentP
+    return preNode
 
 
 def process86(Tree, currentToken, preNode):
@@ -669,94 +596,46 @@ def process87(Tree, currentToken, preNode):
 
 
 def process88(Tree, currentToken, preNode):
-    currentP = Node("ExpK")
-    currentP.name.append(currentToken[2])
-    currentP.Lineno = currentToken[0]
-    currentP.idnum += 1
-    currentP.judge = True
-    currentP.kind["exp"] = judge_node_type(currentToken[2])
-    while len(Tree.SignStack.items) != 0 and get_priority(
-        Tree.SignStack.top().name[0]
-    ) >= get_priority(currentP.name[0]):
-        t = Tree.SignStack.pop()
-        Rnum = Tree.NumStack.pop()
-        Lnum = Tree.NumStack.pop()
-        t.judge = True
-        Lnum.judge = True
-        Rnum.judge = True
-        t.child.append(Lnum)
-        t.child.append(Rnum)
-        Tree.NumStack.push(t)
-    Tree.SignStack.push(currentP)
-    return currentP
+    return preNode
 
 
 def process89(Tree, currentToken, preNode):
-    currentP = Node("ExpK")
-    currentP.name.append("(")
-    currentP.Lineno = currentToken[0]
-    Tree.SignStack.push(currentP)
-    Tree.expflag += 1
-    return currentP
+    return preNode
 
 
 def process90(Tree, currentToken, preNode):
-    currentP = Node("ExpK")
-    currentP.name.append(currentToken[2])
-    currentP.Lineno = currentToken[0]
-    currentP.idnum += 1
-    currentP.judge = True
-    currentP.kind["exp"] = judge_node_type(currentToken[2])
-    Tree.NumStack.push(currentP)
-    return currentP
+    return preNode
 
 
 def process91(Tree, currentToken, preNode):
-    currentP = Node("ExpK")
-    currentP.name.append(currentToken[2])
-    currentP.Lineno = currentToken[0]
-    currentP.idnum += 1
-    currentP.judge = True
-    currentP.kind["exp"] = judge_node_type(currentToken[2])
-    Tree.NumStack.push(currentP)
-    return currentP
+    return preNode
 
 
 def process92(Tree, currentToken, preNode):
     return preNode
 
 
-def process93(Tree, currentToken, preNode):  # ??????????
-    t = Node("ExpK")
-    t.name.append(currentToken[2])
-    t.Lineno = currentToken[0]
-    t.idnum += 1
-    t.judge = True
-    Tree.NumStack.push(t)
-    return t
+def process93(Tree, currentToken, preNode):
+    return preNode
 
 
 def process94(Tree, currentToken, preNode):
-    preNode.kind["exp"] = "IdK"
-    preNode.attr[2]["varkind"] = "IdV"
+    preNode.exp = "IdK"
+    preNode.varkind = "IdV"
     return preNode
 
 
 def process95(Tree, currentToken, preNode):
-    preNode.kind["exp"] = "IdK"
-    preNode.attr[2]["varkind"] = "ArrayMembV"
+    preNode.exp = "IdK"
+    preNode.varkind = "ArrayMembV"
     preNode.child.append(Node("ExpK"))
     Tree.stack.push(preNode.child[0])
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
-    Tree.getExpResult2 = True
     return preNode
 
 
 def process96(Tree, currentToken, preNode):
-    preNode.kind["exp"] = "IdK"
-    preNode.attr[2]["varkind"] = "FieldMembV"
+    preNode.exp = "IdK"
+    preNode.varkind = "FieldMembV"
     preNode.child.append(Node("ExpK"))
     Tree.stack.push(preNode.child[0])
     return preNode
@@ -768,23 +647,19 @@ def process97(Tree, currentToken, preNode):
     ExpK.judge = True
     ExpK.name.append(currentToken[2])
     ExpK.idnum += 1
-    ExpK.kind["exp"] = "IdK"
+    ExpK.exp = "IdK"
     return ExpK
 
 
 def process98(Tree, currentToken, preNode):
-    preNode.attr[2]["varkind"] = "IdV"
+    preNode.varkind = "IdV"
     return preNode
 
 
 def process99(Tree, currentToken, preNode):
-    preNode.attr[2]["varkind"] = "ArrayMembV"
+    preNode.varkind = "ArrayMembV"
     preNode.child.append(Node("ExpK"))
     Tree.stack.push(preNode.child[0])
-    t = Node("ExpK")
-    t.name.append("END")
-    Tree.SignStack.push(t)
-    Tree.getExpResult2 = True
     return preNode
 
 
@@ -812,218 +687,71 @@ def process105(Tree, currentToken, preNode):
     return preNode
 
 
+# 动作表：下标为产生式编号（从1开始），0号不用
+ACTIONS = [None] + [globals()[f"process{num}"] for num in range(1, 106)]
+# 函数体只有return preNode的动作编号，这些动作不改变语法树，分析器可以跳过调用
+NO_OP_ACTIONS = frozenset(
+    {
+        1,
+        4,
+        5,
+        6,
+        10,
+        12,
+        13,
+        17,
+        18,
+        26,
+        28,
+        29,
+        30,
+        31,
+        35,
+        37,
+        38,
+        39,
+        40,
+        42,
+        43,
+        46,
+        47,
+        49,
+        53,
+        54,
+        55,
+        56,
+        58,
+        60,
+        72,
+        75,
+        78,
+        79,
+        81,
+        82,
+        83,
+        84,
+        85,
+        86,
+        87,
+        88,
+        89,
+        90,
+        91,
+        92,
+        93,
+        100,
+        101,
+        102,
+        103,
+        104,
+        105,
+    }
+)
+NO_OP = [num == 0 or num in NO_OP_ACTIONS for num in range(len(ACTIONS))]
+
+
 def predict1(num, tree, currentToken, preNode):
-    if num == 1:
-        t = process1(tree, currentToken, preNode)
-    elif num == 2:
-        t = process2(tree, currentToken, preNode)
-    elif num == 3:
-        t = process3(tree, currentToken, preNode)
-    elif num == 4:
-        t = process4(tree, currentToken, preNode)
-    elif num == 5:
-        t = process5(tree, currentToken, preNode)
-    elif num == 6:
-        t = process6(tree, currentToken, preNode)
-    elif num == 7:
-        t = process7(tree, currentToken, preNode)
-    elif num == 8:
-        t = process8(tree, currentToken, preNode)
-    elif num == 9:
-        t = process9(tree, currentToken, preNode)
-    elif num == 10:
-        t = process10(tree, currentToken, preNode)
-    elif num == 11:
-        t = process11(tree, currentToken, preNode)
-    elif num == 12:
-        t = process12(tree, currentToken, preNode)
-    elif num == 13:
-        t = process13(tree, currentToken, preNode)
-    elif num == 14:
-        t = process14(tree, currentToken, preNode)
-    elif num == 15:
-        t = process15(tree, currentToken, preNode)
-    elif num == 16:
-        t = process16(tree, currentToken, preNode)
-    elif num == 17:
-        t = process17(tree, currentToken, preNode)
-    elif num == 18:
-        t = process18(tree, currentToken, preNode)
-    elif num == 19:
-        t = process19(tree, currentToken, preNode)
-    elif num == 20:
-        t = process20(tree, currentToken, preNode)
-    elif num == 21:
-        t = process21(tree, currentToken, preNode)
-    elif num == 22:
-        t = process22(tree, currentToken, preNode)
-    elif num == 23:
-        t = process23(tree, currentToken, preNode)
-    elif num == 24:
-        t = process24(tree, currentToken, preNode)
-    elif num == 25:
-        t = process25(tree, currentToken, preNode)
-    elif num == 26:
-        t = process26(tree, currentToken, preNode)
-    elif num == 27:
-        t = process27(tree, currentToken, preNode)
-    elif num == 28:
-        t = process28(tree, currentToken, preNode)
-    elif num == 29:
-        t = process29(tree, currentToken, preNode)
-    elif num == 30:
-        t = process30(tree, currentToken, preNode)
-    elif num == 31:
-        t = process31(tree, currentToken, preNode)
-    elif num == 32:
-        t = process32(tree, currentToken, preNode)
-    elif num == 33:
-        t = process33(tree, currentToken, preNode)
-    elif num == 34:
-        t = process34(tree, currentToken, preNode)
-    elif num == 35:
-        t = process35(tree, currentToken, preNode)
-    elif num == 36:
-        t = process36(tree, currentToken, preNode)
-    elif num == 37:
-        t = process37(tree, currentToken, preNode)
-    elif num == 38:
-        t = process38(tree, currentToken, preNode)
-    elif num == 39:
-        t = process39(tree, currentToken, preNode)
-    elif num == 40:
-        t = process40(tree, currentToken, preNode)
-    elif num == 41:
-        t = process41(tree, currentToken, preNode)
-    elif num == 42:
-        t = process42(tree, currentToken, preNode)
-    elif num == 43:
-        t = process43(tree, currentToken, preNode)
-    elif num == 44:
-        t = process44(tree, currentToken, preNode)
-    elif num == 45:
-        t = process45(tree, currentToken, preNode)
-    elif num == 46:
-        t = process46(tree, currentToken, preNode)
-    elif num == 47:
-        t = process47(tree, currentToken, preNode)
-    elif num == 48:
-        t = process48(tree, currentToken, preNode)
-    elif num == 49:
-        t = process49(tree, currentToken, preNode)
-    elif num == 50:
-        t = process50(tree, currentToken, preNode)
-    elif num == 51:
-        t = process51(tree, currentToken, preNode)
-    elif num == 52:
-        t = process52(tree, currentToken, preNode)
-    elif num == 53:
-        t = process53(tree, currentToken, preNode)
-    elif num == 54:
-        t = process54(tree, currentToken, preNode)
-    elif num == 55:
-        t = process55(tree, currentToken, preNode)
-    elif num == 56:
-        t = process56(tree, currentToken, preNode)
-    elif num == 57:
-        t = process57(tree, currentToken, preNode)
-    elif num == 58:
-        t = process58(tree, currentToken, preNode)
-    elif num == 59:
-        t = process59(tree, currentToken, preNode)
-    elif num == 60:
-        t = process60(tree, currentToken, preNode)
-    elif num == 61:
-        t = process61(tree, currentToken, preNode)
-    elif num == 62:
-        t = process62(tree, currentToken, preNode)
-    elif num == 63:
-        t = process63(tree, currentToken, preNode)
-    elif num == 64:
-        t = process64(tree, currentToken, preNode)
-    elif num == 65:
-        t = process65(tree, currentToken, preNode)
-    elif num == 66:
-        t = process66(tree, currentToken, preNode)
-    elif num == 67:
-        t = process67(tree, currentToken, preNode)
-    elif num == 68:
-        t = process68(tree, currentToken, preNode)
-    elif num == 69:
-        t = process69(tree, currentToken, preNode)
-    elif num == 70:
-        t = process70(tree, currentToken, preNode)
-    elif num == 71:
-        t = process71(tree, currentToken, preNode)
-    elif num == 72:
-        t = process72(tree, currentToken, preNode)
-    elif num == 73:
-        t = process73(tree, currentToken, preNode)
-    elif num == 74:
-        t = process74(tree, currentToken, preNode)
-    elif num == 75:
-        t = process75(tree, currentToken, preNode)
-    elif num == 76:
-        t = process76(tree, currentToken, preNode)
-    elif num == 77:
-        t = process77(tree, currentToken, preNode)
-    elif num == 78:
-        t = process78(tree, currentToken, preNode)
-    elif num == 79:
-        t = process79(tree, currentToken, preNode)
-    elif num == 80:
-        t = process80(tree, currentToken, preNode)
-    elif num == 81:
-        t = process81(tree, currentToken, preNode)
-    elif num == 82:
-        t = process82(tree, currentToken, preNode)
-    elif num == 83:
-        t = process83(tree, currentToken, preNode)
-    elif num == 84:
-        t = process84(tree, currentToken, preNode)
-    elif num == 85:
-        t = process85(tree, currentToken, preNode)
-    elif num == 86:
-        t = process86(tree, currentToken, preNode)
-    elif num == 87:
-        t = process87(tree, currentToken, preNode)
-    elif num == 88:
-        t = process88(tree, currentToken, preNode)
-    elif num == 89:
-        t = process89(tree, currentToken, preNode)
-    elif num == 90:
-        t = process90(tree, currentToken, preNode)
-    elif num == 91:
-        t = process91(tree, currentToken, preNode)
-    elif num == 92:
-        t = process92(tree, currentToken, preNode)
-    elif num == 93:
-        t = process93(tree, currentToken, preNode)
-    elif num == 94:
-        t = process94(tree, currentToken, preNode)
-    elif num == 95:
-        t = process95(tree, currentToken, preNode)
-    elif num == 96:
-        t = process96(tree, currentToken, preNode)
-    elif num == 97:
-        t = process97(tree, currentToken, preNode)
-    elif num == 98:
-        t = process98(tree, currentToken, preNode)
-    elif num == 99:
-        t = process99(tree, currentToken, preNode)
-    elif num == 100:
-        t = process100(tree, currentToken, preNode)
-    elif num == 101:
-        t = process101(tree, currentToken, preNode)
-    elif num == 102:
-        t = process102(tree, currentToken, preNode)
-    elif num == 103:
-        t = process103(tree, currentToken, preNode)
-    elif num == 104:
-        t = process104(tree, currentToken, preNode)
-    elif num == 105:
-        t = process105(tree, currentToken, preNode)
-    return t
+    return ACTIONS[num](tree, currentToken, preNode)
 
 
 # syntax_tree = Tree()
@@ -0,0 +1,241 @@
+import time
+
+from GrammarError import dealError
+from SyntaxTree import StackView
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+def describe_terminal(name, delimiters):
+    """错误信息中终结符的称呼"""
+    if name == "ID":
+        return "标识符"
+    if name == "INTC":
+        return "常量"
+    if name == "CHARC":
+        return "字符常量"
+    if name in delimiters:
+        return f"符号{name}"
+    return f"保留字{name}"
+
+
+class CostRepair(dealError):
+    """按代价搜索的错误修复（Burke–Fisher风格）
+
+    在出错位置删除若干Token并插入若干终结符，代价为删除与插入的Token总数。
+    按代价从小到大枚举修复，用向前分析lookahead个原有Token的方式验证；
+    同一代价下取分析最远的修复。每次出错的模拟步数与耗时都有上限，
+    预算耗尽时采用已找到的代价最小且能继续分析的修复。
+    """
+
+    def __init__(
+        self, tables, tokens, max_cost=3, lookahead=5, max_steps=20000, max_seconds=0.05
+    ):
+        super().__init__(tables, tokens)
+        self.max_cost = max_cost
+        self.lookahead = lookahead
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.eof_lexeme = tokens.lexemes.intern("EOF")
+
+    def _prepare_inserted(self):
+        self.inserted_id = self.tokens.append(0, "ID", "error")
+        super()._prepare_inserted()
+        # 可插入的终结符：列号 -> (插入的Token, 描述)
+        inserted = dict(self.inserted, ID=self.inserted_id, INTC=self.inserted_const)
+        self.insertable = {
+            self.tables.columns[name]: (token, describe_terminal(name, self.delimiters))
+            for name, token in inserted.items()
+        }
+
+    def _tick(self):
+        self.steps_left -= 1
+        if self.steps_left <= 0 or time.perf_counter() > self.deadline:
+            raise _BudgetExhausted
+
+    def _expected_columns(self, signs):
+        if signs.isEmpty():
+            return ()
+        sign = signs.top()
+        if sign < self.nt_count:
+            return self.tables.expected[sign]
+        return (sign - self.nt_count,)
+
+    def _shift(self, signs, column):
+        # 展开符号栈直到匹配列号为column的终结符，失败返回False
+        table, width = self.tables.table, self.tables.width
+        while not signs.isEmpty():
+            self._tick()
+            sign = signs.top()
+            if sign < self.nt_count:
+                production_id = table[sign * width + column]
+                if production_id == -1:
+                    return False
+                signs.pop()
+                signs.extend(self.tables.push_symbols[production_id])
+            elif sign == self.nt_count + column:
+                signs.pop()
+                return True
+            else:
+                return False
+        return False
+
+    def _progress(self, signs, cursor):
+        # 修复后能继续分析的原有Token数，到达EOF视为全部通过
+        consumed = 0
+        while consumed < self.lookahead:
+            token = cursor.top()
+            if self.tokens.lexeme_ids[token] == self.eof_lexeme:
+                return self.lookahead
+            if signs.isEmpty():
+                # 符号栈已空而输入未结束，分析器会停在此处
+                return consumed
+            column = self.token_columns[self.tokens.type_ids[token]]
+            if column < 0 or not self._shift(signs, column):
+                return consumed
+            cursor.pop()
+            consumed += 1
+        return consumed
+
+    def _insert_states(self, signs, count):
+        # 依次插入count个终结符后的符号栈，每个插入的终结符都必须被匹配
+        if count == 0:
+            yield signs, ()
+            return
+        for column in sorted(self._expected_columns(signs)):
+            if column not in self.insertable:
+                continue
+            shifted = signs.fork()
+            if self._shift(shifted, column):
+                for state, rest in self._insert_states(shifted, count - 1):
+                    yield state, (column,) + rest
+
+    def _deletable(self, TokenStack):
+        # 出错位置之后可删除的Token数（不含EOF），最多max_cost个
+        cursor = TokenStack.fork()
+        count = 0
+        while count < self.max_cost and not cursor.isEmpty():
+            if self.tokens.lexeme_ids[cursor.pop()] == self.eof_lexeme:
+                break
+            count += 1
+        return count
+
+    def _search(self, SignStack, TokenStack):
+        found = []  # (代价, -前进Token数, 删除数, 插入的列号)
+        deletable = self._deletable(TokenStack)
+        try:
+            for cost in range(1, self.max_cost + 1):
+                accepted = []
+                for insert_count in range(cost, -1, -1):
+                    deleted = cost - insert_count
+                    if deleted > deletable:
+                        continue
+                    states = self._insert_states(StackView(SignStack), insert_count)
+                    for signs, inserted in states:
+                        cursor = TokenStack.fork()
+                        for _ in range(deleted):
+                            cursor.pop()
+                        progress = self._progress(signs, cursor)
+                        if progress == 0:
+                            continue
+                        found.append((cost, -progress, deleted, inserted))
+                        if progress >= self.lookahead:
+                            accepted.append(found[-1])
+                if accepted:
+                    return min(accepted, key=lambda repair: repair[:2])
+        except _BudgetExhausted:
+            pass
+        if found:
+            return min(found, key=lambda repair: repair[:2])
+        if deletable:
+            return (1, 0, 1, ())
+        return None
+
+    def _describe(self, deleted_tokens, inserted):
+        names = [self.insertable[column][1] for column in inserted]
+        if len(deleted_tokens) == 1 and len(names) == 1:
+            return f"符号{self.tokens.lexeme(deleted_tokens[0])}应为{names[0]}"
+        parts = [f"缺少{name}" for name in names]
+        parts += [f"多余符号{self.tokens.lexeme(token)}" for token in deleted_tokens]
+        return "，".join(parts)
+
+    def run(
+        self,
+        SignStack,
+        TokenStack,
+        sign_push_history,
+        prod_length_stack,
+        token_back_stack,
+    ):
+        if self.inserted is None:
+            self._prepare_inserted()
+        self.steps_left = self.max_steps
+        self.deadline = time.perf_counter() + self.max_seconds
+
+        repair = self._search(SignStack, TokenStack)
+        if repair is None:
+            return False, self._diagnose_remaining_errors(TokenStack)
+
+        _, _, deleted, inserted = repair
+        deleted_tokens = [TokenStack.pop() for _ in range(deleted)]
+        for column in reversed(inserted):
+            TokenStack.push(self.insertable[column][0])
+        return True, self._describe(deleted_tokens, inserted)
+
+
+class PanicRepair(dealError):
+    """恐慌模式错误恢复
+
+    栈顶为终结符时视为缺少该终结符并将其弹出；栈顶为非终结符时跳过Token，
+    直到遇到该非终结符可接受的Token（继续分析），或其FOLLOW集合、
+    同步集合中的Token及EOF（弹出该非终结符）。每次恢复至少弹出一个符号
+    或跳过一个Token，不做模拟，整体为线性时间。
+    """
+
+    def __init__(self, tables, tokens, sync=(";", "END", "FI", "ENDWH")):
+        super().__init__(tables, tokens)
+        self.sync = frozenset(tables.columns[name] for name in sync)
+        self.eof_lexeme = tokens.lexemes.intern("EOF")
+
+    def run(
+        self,
+        SignStack,
+        TokenStack,
+        sign_push_history,
+        prod_length_stack,
+        token_back_stack,
+    ):
+        if self.inserted is None:
+            self._prepare_inserted()
+        sign = SignStack.top()
+        if sign >= self.nt_count:
+            SignStack.pop()
+            name = self.tables.symbol_names[sign]
+            return True, f"缺少{describe_terminal(name, self.delimiters)}"
+
+        expected = self.tables.expected[sign]
+        stop = self.tables.follow[sign] | self.sync
+        skipped = []
+        while True:
+            token = TokenStack.top()
+            if self.tokens.lexeme_ids[token] == self.eof_lexeme:
+                break
+            column = self.token_columns[self.tokens.type_ids[token]]
+            if column in expected:
+                return True, self._describe_skipped(skipped)
+            if column in stop:
+                break
+            skipped.append(TokenStack.pop())
+
+        SignStack.pop()
+        if skipped:
+            return True, self._describe_skipped(skipped)
+        return True, f"缺少语法成分{self.tables.symbol_names[sign]}"
+
+    def _describe_skipped(self, skipped):
+        message = f"多余符号{self.tokens.lexeme(skipped[0])}"
+        if len(skipped) > 1:
+            message += f"等{len(skipped)}个符号"
+        return message
@@ -1,7 +1,12 @@
+from ExpressionParser import ExpressionParser
 from GrammarError import dealError
-from GrammarProcess import predict1
+from GrammarRepair import CostRepair, PanicRepair
+from GrammarProcess import ACTIONS, NO_OP
+from ParseEvents import ENTER, ERROR, EXIT, TOKEN, dispatch
 from SyntaxTree import Stack, Tree
-from PredictSetGeneration import GrammarAnalyzer
+from TokenStore import BACK, TokenCursor, TokenStore
+from PredictSetGeneration import load_tables
+import os
 import sys
 
 
@@ -14,45 +19,51 @@ def handle_index_error(exc_type, exc_value, exc_traceback):
 
 sys.excepthook = handle_index_error
 
+# 可选的错误恢复方式
+RECOVERY = {"standard": dealError, "cost": CostRepair, "panic": PanicRepair}
+
 
 class LL1:
 
-    def __init__(self, grammar_path, token_path, tree_path):
+    def __init__(
+        self,
+        grammar_path,
+        token_path,
+        tree_path,
+        recovery="standard",
+        incremental=False,
+    ):
+        # token_path可以是.tk文件路径、iter_tokens()产生的Token序列或TokenStore
+        if isinstance(token_path, TokenStore):
+            self.tokens = token_path
+        else:
+            self.tokens = TokenStore.load(token_path)
         # 数据结构初始化
-        self.TokenStack = Stack()  # 词栈
+        self.TokenStack = TokenCursor(self.tokens)  # 词栈，元素为Token下标
+        self.eof_lexeme = self.tokens.lexemes.intern("EOF")
         self.SignStack = Stack()  # 符号栈
-        self.grammar = []
         self.flag = True
-        # 语法分析器初始化
-        analyzer = GrammarAnalyzer()
-        self.predict, self.non_terminals, self.terminals = analyzer.analyze_grammar()
+        # 语法分析器初始化：预测集、产生式与分析表来自按文法哈希缓存的结果
+        self.tables = tables = load_tables(grammar_path)
+        self.predict = tables.predict
+        self.non_terminals = tables.non_terminals
+        self.terminals = tables.terminals
+        self.grammar = tables.grammar
         self.TreePath = tree_path
+        # 增量输出：最外层的过程分析完毕即写入文件并释放，
+        # 分析结束后self.syntax_tree只保留尚未输出的部分
+        self.incremental = incremental
+        # 符号栈中为符号编号，Token类型经转换表得到分析表列号
+        self.token_columns = tables.token_columns(self.tokens.type_names)
 
-        # 加载语法规则
-        with open(grammar_path) as f:
-            lines = f.readlines()
-            for line in lines:
-                parts = line.strip().split(" ", 20)  # 保持最大分割数
-                self.grammar.append({"left": parts[0], "right": parts[2:]})
-
-        # 加载Token（保持逆序压栈逻辑）
-        with open(token_path) as f:
-            lines = f.readlines()
-            for token in reversed(lines):
-                parts = token.strip().split(" ", 20)  # 保持最大分割数
-                self.TokenStack.push(parts)
-
-        self.SignStack.push("Program")
+        self.SignStack.push(tables.symbol_ids["Program"])
 
-        # 预测表构建（保持原始逻辑）
-        self.non_term_map, self.predict_table = self._build_predict_table()
-
-        self.error_handler = dealError(
-            self.non_terminals, self.non_term_map, self.predict_table, self.grammar
-        )
+        self.error_handler = RECOVERY[recovery](tables, self.tokens)
         self.errors = []
         self._init_recovery_stacks()
         self.run_success = False
+        # 错误恢复后停止建树（见_parse）时为False，此时不输出.ast
+        self.tree_complete = True
 
     def _init_recovery_stacks(self):
         # 栈初始化
@@ -60,37 +71,18 @@ class LL1:
         self.prod_length_stack = Stack()
         self.token_back_stack = Stack()
 
-    def _build_predict_table(self):
-        # 构造LL1分析表
-        non_term_map = {}
-        predict_table = []
-        current_row = 0
-
-        for idx, rule in enumerate(self.grammar):
-            left = rule["left"]
-
-            if left not in non_term_map:
-                non_term_map[left] = current_row
-                predict_table.append({t: -1 for t in self.terminals})
-                current_row += 1
-
-            row = non_term_map[left]
-            for symbol in self.predict[idx + 1]:  # 注意self.predict的起始索引
-                predict_table[row][symbol] = idx
-
-        return non_term_map, predict_table
-
     # token类型
-    def _get_token_type(self, token_entry):
+    def _get_token_type(self, token):
+        return self.tokens.type_names[self.tokens.type_ids[token]]
 
-        if token_entry[1] in {"ID", "INTC", "CHARC"}:
-            return token_entry[1]
-        return token_entry[2]
+    def _at_eof(self):
+        # 与.tk第三列为EOF的判断一致，按词素编号比较
+        return self.tokens.lexeme_ids[self.TokenStack.top()] == self.eof_lexeme
 
     # 记录错误
-    def _record_error(self, token_entry, message):
+    def _record_error(self, token, message):
 
-        line_num = int(token_entry[0])
+        line_num = self.tokens.lines[token]
         # 保持行号调整逻辑
         need_adjust = True
         for keyword in ["常量", ";"]:
@@ -113,68 +105,212 @@ class LL1:
         self._record_error(current_token, msg)
         return success
 
+    def _token_column(self, token):
+        return self.token_columns[self.tokens.type_ids[token]]
+
     def run(self):
 
-        syntax_tree = Tree()
-        current_node = syntax_tree.root
+        if self.incremental:
+            # 先写入临时文件，分析中途异常退出时与一次性输出一样不生成.ast
+            partial_path = self.TreePath + ".part"
+            with open(partial_path, "w") as output_file:
+                try:
+                    syntax_tree = self._build_tree(output_file)
+                    if self.tree_complete:
+                        syntax_tree.flush()
+                except BaseException:
+                    output_file.close()
+                    os.remove(partial_path)
+                    raise
+            if self.tree_complete:
+                os.replace(partial_path, self.TreePath)
+            else:
+                os.remove(partial_path)
+        else:
+            syntax_tree = self._build_tree(None)
+            if self.tree_complete:
+                # 向文件书写语法树
+                syntax_tree.getInfNode(self.TreePath)
+        if not self.tree_complete:
+            # 不完整的语法树不能用于语义分析，也不保留之前生成的.ast
+            try:
+                os.remove(self.TreePath)
+            except FileNotFoundError:
+                pass
+        self.syntax_tree = syntax_tree
 
-        while not self.SignStack.isEmpty() and self.TokenStack.top()[2] != "EOF":
-            current_sign = self.SignStack.top()
-            current_token = self.TokenStack.top()
-            token_type = self._get_token_type(current_token)
+    def _build_tree(self, output):
+        # output不为None时边分析边输出语法树
+        syntax_tree = Tree(output)
+        for _ in self._parse(syntax_tree):
+            pass
+        return syntax_tree
+
+    def check(self):
+        """只检查语法：使用相同的分析表与错误恢复，但不执行语义动作、
+        不生成语法树也不写文件，结果只有self.errors"""
+        for _ in self._parse(None):
+            pass
+
+    def events(self):
+        """以生成器方式边分析边产生事件（见ParseEvents），不生成语法树"""
+        return self._parse(None, events=True)
+
+    def stream(self, handler):
+        """以回调方式处理事件流，handler为ParseEvents.ParseHandler"""
+        dispatch(self.events(), handler)
+
+    def _parse(self, syntax_tree, events=False):
+        # syntax_tree为None时只做语法检查，不执行语义动作；
+        # events为True时产生事件，否则不产生任何值。
+        # 错误恢复后语法树栈不再可靠，表达式也无法按原输入生成，之后只检查语法
+        current_node = None if syntax_tree is None else syntax_tree.root
+        tables = self.tables
+        nt_count, width, table = tables.nt_count, tables.width, tables.table
+        push_symbols, right_lengths = tables.push_symbols, tables.right_lengths
+        signs = self.SignStack.items
+        history = self.sign_push_history.items
+        lengths = self.prod_length_stack.items
+        backs = self.token_back_stack.items
+        cursor = self.TokenStack
+        lexeme_ids, type_ids = self.tokens.lexeme_ids, self.tokens.type_ids
+        token_columns, eof_lexeme = self.token_columns, self.eof_lexeme
+        # 已展开而未分析完的非终结符：(符号, 展开前在符号栈之下的深度)
+        open_nodes = []
+        lines, last_line = self.tokens.lines, 0
+        building = syntax_tree is not None
+        if building:
+            type_names = self.tokens.type_names
+            types = [type_names[type_id] for type_id in type_ids]
+            expressions = ExpressionParser(self.tokens, types, syntax_tree)
+        exp_sign, rel_exp_sign = tables.symbol_ids["Exp"], tables.symbol_ids["RelExp"]
+        # 正在分析的最外层表达式：(展开前在符号栈之下的深度, 起始Token, 符号)，
+        # 其间不执行语义动作，分析完毕后由ExpressionParser生成整棵子树
+        expression = None
+
+        while signs:
+            current_token = cursor.top()
+            if expression is not None and len(signs) <= expression[0]:
+                _, start, sign = expression
+                if sign == rel_exp_sign:
+                    current_node, _ = expressions.parse_relation(start)
+                else:
+                    current_node, _ = expressions.parse(start)
+                expression = None
+            if events:
+                # 符号栈回落到展开前的深度，说明该非终结符已分析完毕
+                while open_nodes and len(signs) <= open_nodes[-1][1]:
+                    sign = open_nodes.pop()[0]
+                    yield EXIT, tables.symbol_names[sign], last_line, None
+            if lexeme_ids[current_token] == eof_lexeme:
+                break
+            current_sign = signs[-1]
+            column = token_columns[type_ids[current_token]]
 
-            if current_sign in self.non_terminals:
+            if current_sign < nt_count:
 
-                row = self.non_term_map[current_sign]
-                production_id = self.predict_table[row][token_type]
+                if column < 0:
+                    # 不属于文法终结符的Token类型无法查表
+                    raise KeyError(self._get_token_type(current_token))
+                production_id = table[current_sign * width + column]
 
-                if production_id != -1:
+                if production_id == -1:
+                    success = self._handle_error(current_token)
+                    if events:
+                        yield self._error_event()
+                    if not success:
+                        break
+                    building, expression = False, None
+                    continue
+                if events:
+                    base = len(signs) - 1
+                    # 右递归（如StmList、Exp）在尾部再次展开同一非终结符时，
+                    # 先结束上一层，使其成为同级节点，祖先路径不随列表变长
+                    idx = len(open_nodes)
+                    while idx and open_nodes[idx - 1][1] == base:
+                        idx -= 1
+                        if open_nodes[idx][0] == current_sign:
+                            while len(open_nodes) > idx:
+                                sign = open_nodes.pop()[0]
+                                yield EXIT, tables.symbol_names[sign], last_line, None
+                            break
+                    open_nodes.append((current_sign, base))
+                    line = lines[current_token]
+                    yield ENTER, tables.symbol_names[current_sign], line, None
+                if building and expression is None:
+                    if current_sign == exp_sign or current_sign == rel_exp_sign:
+                        expression = (len(signs) - 1, current_token, current_sign)
+                if building and expression is None:
                     current_node = self._apply_production(
                         production_id, syntax_tree, current_token, current_node
                     )
                 else:
-                    if not self._handle_error(current_token):
-                        break
+                    # 与_expand相同，不生成语法树时内联以减少调用
+                    history.append(signs.pop())
+                    backs.append(BACK)
+                    lengths.append(right_lengths[production_id])
+                    signs.extend(push_symbols[production_id])
             else:
 
-                if current_sign == token_type:
-                    self._match_terminal()
+                if current_sign == nt_count + column:
+                    history.append(signs.pop())
+                    lengths.append(0)
+                    backs.append(cursor.pop())
+                    if events:
+                        last_line = lines[current_token]
+                        kind = self._get_token_type(current_token)
+                        lexeme = self.tokens.lexeme(current_token)
+                        yield TOKEN, kind, last_line, lexeme
                 else:
-                    if not self._handle_error(current_token):
+                    success = self._handle_error(current_token)
+                    if events:
+                        yield self._error_event()
+                    if not success:
                         break
+                    building, expression = False, None
+
+        # 输入结束时仍未分析完的非终结符
+        while open_nodes:
+            sign = open_nodes.pop()[0]
+            yield EXIT, tables.symbol_names[sign], last_line, None
 
         # 最终验证逻辑，判断是否有多余符号
-        if self.TokenStack.top()[2] != "EOF" and not self.errors:
+        if not self._at_eof() and not self.errors:
             self.errors.append(
-                {"line": int(self.TokenStack.top()[0]), "message": "符号栈仍有残余"}
+                {
+                    "line": self.tokens.lines[self.TokenStack.top()],
+                    "message": "符号栈仍有残余",
+                }
             )
-        self.run_success = self.TokenStack.top()[2] == "EOF"
+            if events:
+                yield self._error_event()
+        self.run_success = self._at_eof()
+        if syntax_tree is not None:
+            self.tree_complete = building
 
-        # 向文件书写语法树
-        syntax_tree.getInfNode(self.TreePath)
-        self.syntax_tree = syntax_tree
+    def _error_event(self):
+        error = self.errors[-1]
+        return ERROR, None, error["line"], error["message"]
 
-    def _apply_production(self, prod_id, tree, token, node):
+    def _expand(self, prod_id):
 
         self.sign_push_history.push(self.SignStack.pop())
-        self.token_back_stack.push(["", "back", ""])
+        self.token_back_stack.push(BACK)
 
-        production = self.grammar[prod_id]["right"]
-        self.prod_length_stack.push(len(production))
+        self.prod_length_stack.push(self.tables.right_lengths[prod_id])
 
-        # 保持逆序压栈逻辑
-        for symbol in reversed(production):
-            if symbol != "NULL":
-                self.SignStack.push(symbol)
+        # 已按逆序编码、去掉NULL的右部
+        self.SignStack.items.extend(self.tables.push_symbols[prod_id])
 
-        # 保持语法树生成参数
-        return predict1(prod_id + 1, tree, token, node)  # 保持+1偏移
+    def _apply_production(self, prod_id, tree, token, node):
 
-    def _match_terminal(self):
+        self._expand(prod_id)
 
-        self.sign_push_history.push(self.SignStack.pop())
-        self.prod_length_stack.push(0)
-        self.token_back_stack.push(self.TokenStack.pop())
+        # 动作表按产生式编号索引（保持+1偏移），空动作直接跳过
+        num = prod_id + 1
+        if NO_OP[num]:
+            return node
+        return ACTIONS[num](tree, self.tokens.entry(token), node)
 
     def showError(self, verbose=False):
         # 错误格式输出
@@ -1,9 +1,11 @@
 import os
+import re
 
 from config import delimiters, reservedWords
 
 
 class Token:
+    __slots__ = ("line", "lex", "sem")
 
     def __init__(self, line, lex, sem):
         self.line = line
@@ -11,13 +13,11 @@ class Token:
         self.sem = sem
 
 
-tokenList = []
 flag = 0
 
 
 def init():
-    global tokenList, flag
-    tokenList = []
+    global flag
     flag = 0
 
 
@@ -25,24 +25,25 @@ def add(word, num, err=False):
     global flag
     if err:
         flag = -1
-        tokenList.append(Token(num, "ERROR", word))
         print(f"line:{num + 1} invalid: {word}")
+        return Token(num, "ERROR", word)
     elif str.isdigit(word):
-        tokenList.append(Token(num, "INTC", int(word, 10)))
+        return Token(num, "INTC", int(word, 10))
     elif word in delimiters:
-        tokenList.append((Token(num, delimiters[word], word)))
+        return Token(num, delimiters[word], word)
     elif word in reservedWords:
-        tokenList.append((Token(num, reservedWords[word], word)))
+        return Token(num, reservedWords[word], word)
     elif word[0] == "'" and word[-1] == "'":
-        tokenList.append((Token(num, "CHARC", word)))
+        return Token(num, "CHARC", word)
     else:
-        tokenList.append((Token(num, "ID", word)))
+        return Token(num, "ID", word)
 
 
 def work(lines):
     commentflag = False
-    for num in range(0, len(lines)):
-        line = lines[num].replace("\n", "", -1) + " "
+    num = -1
+    for num, line in enumerate(lines):
+        line = line.replace("\n", "", -1) + " "
         i = 0
         while i < len(line):
             c = line[i]
@@ -54,68 +55,159 @@ def work(lines):
                 while str.isdigit(line[i + 1]):
                     word = word + line[i + 1]
                     i = i + 1
-                add(word, num)
+                yield add(word, num)
             elif str.isalpha(c):
                 word = c
                 while str.isdigit(line[i + 1]) or str.isalpha(line[i + 1]):
                     word = word + line[i + 1]
                     i = i + 1
-                add(word, num)
+                yield add(word, num)
             elif c == ".":
                 if line[i + 1] == ".":
                     i = i + 1
-                    add("..", num)
+                    yield add("..", num)
                 else:
-                    add(".", num)
+                    yield add(".", num)
             elif c == "'":
                 word = c
                 i = i + 1
                 while i < len(line):
                     word = word + line[i]
                     if line[i] == "'":
-                        add(word, num)
+                        yield add(word, num)
                         break
                     elif (str.isdigit(line[i]) or str.isalpha(line[i])) == False:
-                        add(word, num, True)
+                        yield add(word, num, True)
                         break
                     i = i + 1
             elif c == "{":
                 commentflag = True
             elif c == ":":
                 if line[i + 1] == "=":
-                    add(":=", num)
+                    yield add(":=", num)
                 else:
-                    add(line[i] + line[i + 1], num, True)
+                    yield add(line[i] + line[i + 1], num, True)
                 i = i + 1
             elif c in delimiters:
-                add(c, num)
+                yield add(c, num)
             elif c == " " or c == "	":
                 _ = c
             else:
-                add(line[i], num, True)
+                yield add(line[i], num, True)
             i = i + 1
-    tokenList.append(Token(len(lines), "EOF", "EOF"))
-    return tokenList
+    yield Token(num + 1, "EOF", "EOF")
+
+
+class _CharClasses(dict):
+    """字符类别表：ASCII预先计算，其余字符首次出现时按str.isdigit/isalpha归类"""
+
+    def __missing__(self, code):
+        c = chr(code)
+        if str.isdigit(c):
+            cls = "0"
+        elif str.isalpha(c):
+            cls = "a"
+        elif c == " " or c == "	":
+            cls = " "
+        elif c in ".:'{}=":
+            cls = c
+        elif c in delimiters:
+            cls = ";"
+        else:
+            cls = "?"
+        self[code] = cls
+        return cls
+
+
+_CHAR_CLASSES = _CharClasses()
+for _code in range(128):
+    _CHAR_CLASSES[_code]
+
+# 在类别串上运行的DFA，分支顺序与work()中的判断顺序一致
+_TOKEN_PATTERN = re.compile(
+    r" *(?:"
+    r"(?P<word>a[a0]*)"
+    r"|(?P<delim>\.\.?|:=|[;=])"
+    r"|(?P<num>0+)"
+    r"|(?P<char>'[a0]*')"
+    r"|(?P<comment>\{[^}]*\})"
+    r"|(?P<open>\{)"
+    r"|(?P<error>:.|'[a0]*.|[^ ])"
+    r")",
+    re.DOTALL,
+)
+
+
+def work_table(lines):
+    """表驱动的词法分析，产生与work()完全相同的Token序列"""
+    commentflag = False
+    num = -1
+    for num, line in enumerate(lines):
+        line = line.replace("\n", "", -1) + " "
+        pos = 0
+        if commentflag:
+            pos = line.find("}") + 1
+            if pos == 0:
+                continue
+            commentflag = False
+        for m in _TOKEN_PATTERN.finditer(line.translate(_CHAR_CLASSES), pos):
+            group = m.lastgroup
+            word = line[m.start(group) : m.end()]
+            if group == "word":
+                yield Token(num, reservedWords.get(word, "ID"), word)
+            elif group == "delim":
+                yield Token(num, delimiters[word], word)
+            elif group == "num":
+                yield Token(num, "INTC", int(word, 10))
+            elif group == "char":
+                yield Token(num, "CHARC", word)
+            elif group == "open":
+                commentflag = True
+                break
+            elif group == "error":
+                yield add(word, num, True)
+    yield Token(num + 1, "EOF", "EOF")
+
 
+ENGINES = {"scan": work, "table": work_table}
 
-def lex(pro_path, token_path):
+
+def iter_tokens(source, engine="table"):
+    """逐行读取源程序并逐个产生Token，source可以是路径或已打开的文件对象"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf8") as file:
+            yield from ENGINES[engine](file)
+    else:
+        yield from ENGINES[engine](source)
+
+
+def format_token(token):
+    """Token在.tk文件中的文本行（不含换行符）"""
+    if token.sem in delimiters:
+        return f"{token.line} Other {token.sem}"
+    elif token.sem in reservedWords:
+        return f"{token.line} Reserved_word {token.lex}"
+    return f"{token.line} {token.lex} {token.sem}"
+
+
+def token_entry(token):
+    """Token按语法分析读取.tk行的方式拆分后的条目"""
+    return format_token(token).strip().split(" ", 20)
+
+
+def lex(pro_path, token_path, engine="table", binary=False):
     init()
     if not os.path.exists(pro_path):
         print(f"Open pro_path:{pro_path} failed")
         return -1
-    with open(pro_path, encoding="utf8") as file:
-        lines = file.readlines()
-        work(lines)
-        # print(f"line: {x.line}, lex: {x.lex}, sem: {x.sem}")
-
-    with open(token_path, "w") as file:
-        for x in tokenList:
-            if x.sem in delimiters:
-                file.write(f"{x.line} Other {x.sem}\n")
-            elif x.sem in reservedWords:
-                file.write(f"{x.line} Reserved_word {x.lex}\n")
-            else:
-                file.write(f"{x.line} {x.lex} {x.sem}\n")
+    if binary:
+        from TokenStore import TokenStore
+
+        TokenStore.load(iter_tokens(pro_path, engine)).save(token_path)
+    else:
+        with open(token_path, "w") as file:
+            for x in iter_tokens(pro_path, engine):
+                file.write(format_token(x) + "\n")
     if flag == 0:
         print("Generate token success")
     else:
@@ -0,0 +1,46 @@
+"""语法分析事件流
+
+LL1.events()边分析边产生事件，每个事件为(种类, 名称, 行号, 值)：
+    (ENTER, 非终结符, 行号, None)   开始展开非终结符，行号为当前Token所在行
+    (EXIT, 非终结符, 行号, None)    非终结符的右部分析完毕，行号为最后匹配的Token所在行
+    (TOKEN, Token类型, 行号, 词素)  匹配一个终结符
+    (ERROR, None, 行号, 错误信息)   发生语法错误，与LL1.errors中记录的一致
+ENTER与EXIT总是成对出现（错误恢复弹出的非终结符也会产生EXIT）。
+右递归的列表（StmList、Exp等）在尾部再次展开同一非终结符时作为同级节点，
+祖先路径的长度只与程序的嵌套层数有关，消费者只需保存祖先路径即可
+增量处理任意大的程序。
+"""
+
+ENTER = "enter"
+EXIT = "exit"
+TOKEN = "token"
+ERROR = "error"
+
+
+class ParseHandler:
+    """回调方式的事件处理器，按需重写对应方法"""
+
+    def enter(self, name, line):
+        pass
+
+    def exit(self, name, line):
+        pass
+
+    def token(self, kind, lexeme, line):
+        pass
+
+    def error(self, message, line):
+        pass
+
+
+def dispatch(events, handler):
+    """把事件流依次交给handler处理"""
+    for kind, name, line, value in events:
+        if kind == TOKEN:
+            handler.token(name, value, line)
+        elif kind == ENTER:
+            handler.enter(name, line)
+        elif kind == EXIT:
+            handler.exit(name, line)
+        else:
+            handler.error(value, line)
@@ -1,5 +1,14 @@
-import copy
+import hashlib
 import os
+import pickle
+import tempfile
+from array import array
+
+DEFAULT_GRAMMAR = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "./data/grammar.txt"
+)
+# 表结构或分析算法变化时递增，使旧缓存失效
+CACHE_VERSION = 5
 
 
 class GrammarAnalyzer:
@@ -12,149 +21,135 @@ class GrammarAnalyzer:
         self.follow_sets = {"": set()}
         self.predict_sets = {0: set()}
 
-    def compute_first_for_production(self, production, terminals):
-        """计算单个产生式的FIRST集合"""
-        left_symbol = production[0]
-        has_terminator = False
-
-        for symbol in production[2:]:  # 遍历产生式右侧
-            if symbol in terminals:  # 遇到终结符
-                self.first_sets[left_symbol].add(symbol)
-                has_terminator = True
-                break
-            elif "NULL" not in self.first_sets[symbol]:  # 非终结符且不包含空
-                self.first_sets[left_symbol] = self.first_sets[left_symbol].union(
-                    self.first_sets[symbol]
-                )
-                has_terminator = True
-                break
-            else:  # 非终结符且包含空，继续处理下一个符号
-                self.first_sets[left_symbol] = self.first_sets[left_symbol].union(
-                    self.first_sets[symbol]
-                ) - {"NULL"}
-
-        # 处理右侧全可空的情况
-        if not has_terminator and (
-            "NULL" in self.first_sets[production[len(production) - 1]]
-        ):
-            self.first_sets[left_symbol].add("NULL")
-
-    def update_follow_for_symbol(self, production, symbol_pos, terminals):
-        """更新某个符号在产生式中的FOLLOW集合"""
-        current_symbol = production[symbol_pos]
-        next_pos = symbol_pos + 1
-
-        # 处理后续可能为空的符号
-        while (
-            next_pos < len(production)
-            and production[next_pos] not in terminals
-            and "NULL" in self.first_sets[production[next_pos]]
-        ):
-            self.follow_sets[current_symbol] = self.follow_sets[current_symbol].union(
-                self.first_sets[production[next_pos]]
-            ) - {"NULL"}
-
-            next_pos += 1
-
-        # 处理结尾或遇到不可空符号的情况
-        if next_pos == len(production):
-            self.follow_sets[current_symbol] = self.follow_sets[current_symbol].union(
-                self.follow_sets[production[0]]
-            )
-        elif production[next_pos] in terminals:
-            self.follow_sets[current_symbol].add(production[next_pos])
-        else:
-            self.follow_sets[current_symbol] = self.follow_sets[current_symbol].union(
-                self.first_sets[production[next_pos]]
+    def index_symbols(self):
+        """为符号分配整数编号：非终结符为非负编号，终结符为位序号取反"""
+        self.nt_names = list(dict.fromkeys(prod[0] for prod in self.productions))
+        self.nt_ids = {nt: i for i, nt in enumerate(self.nt_names)}
+        # "#"为输入结束符，"NULL"位在FIRST中表示可空
+        self.term_names = sorted(self.terminals | {"NULL", "#"})
+        term_ids = {t: ~i for i, t in enumerate(self.term_names)}
+        self.null_code = term_ids["NULL"]
+        self.null_bit = 1 << ~self.null_code
+        self.end_bit = 1 << ~term_ids["#"]
+        self.encoded = [
+            (
+                self.nt_ids[prod[0]],
+                [self.nt_ids.get(symbol, term_ids.get(symbol)) for symbol in prod[2:]],
             )
+            for prod in self.productions
+        ]
 
-    def compute_predict(self, production, entry_id, terminals):
-        """计算预测分析表条目"""
-        current_pos = 2  # 产生式右侧起始位置
-
-        # 遍历可能为空的符号
-        while (
-            current_pos < len(production)
-            and production[current_pos] not in terminals
-            and "NULL" in self.first_sets[production[current_pos]]
-        ):
-            self.predict_sets[entry_id] = self.predict_sets[entry_id].union(
-                self.first_sets[production[current_pos]]
-            ) - {"NULL"}
-            current_pos += 1
-
-        # 处理不同结束情况
-        if current_pos == len(production):
-            self.predict_sets[entry_id] = self.predict_sets[entry_id].union(
-                self.follow_sets[production[0]]
-            )
-        elif production[current_pos] in terminals:
-            if production[current_pos] != "NULL":
-                self.predict_sets[entry_id].add(production[current_pos])
+    def decode(self, bits):
+        """终结符位图转换为名字集合"""
+        names = set()
+        while bits:
+            low = bits & -bits
+            names.add(self.term_names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    @staticmethod
+    def propagate(sets, feeds, mask=-1):
+        """沿依赖边传播位图直到稳定：feeds[x]中的每个a满足sets[a] ⊇ sets[x] & mask"""
+        worklist = list(range(len(sets)))
+        while worklist:
+            x = worklist.pop()
+            bits = sets[x] & mask
+            for a in feeds[x]:
+                if bits & ~sets[a]:
+                    sets[a] |= bits
+                    worklist.append(a)
+
+    def compute_nullable(self):
+        """求可空非终结符：右部非终结符全部可空（NULL视为空串）时左部可空"""
+        count = len(self.nt_names)
+        self.nullable = [False] * count
+        remaining = []
+        occurs = [[] for _ in range(count)]
+        worklist = []
+        for idx, (left, right) in enumerate(self.encoded):
+            symbols = [symbol for symbol in right if symbol != self.null_code]
+            if any(symbol < 0 for symbol in symbols):
+                remaining.append(-1)
+                continue
+            remaining.append(len(symbols))
+            for symbol in symbols:
+                occurs[symbol].append(idx)
+            if not symbols:
+                worklist.append(left)
+        while worklist:
+            nt = worklist.pop()
+            if self.nullable[nt]:
+                continue
+            self.nullable[nt] = True
+            for idx in occurs[nt]:
+                remaining[idx] -= 1
+                if remaining[idx] == 0:
+                    worklist.append(self.encoded[idx][0])
+
+    def compute_first_sets(self):
+        """FIRST位图：先收集直接终结符与依赖边，再一次传播"""
+        count = len(self.nt_names)
+        self.first = [0] * count
+        feeds = [set() for _ in range(count)]
+        for left, right in self.encoded:
+            for symbol in right:
+                if symbol < 0:
+                    self.first[left] |= 1 << ~symbol
+                    break
+                if symbol != left:
+                    feeds[symbol].add(left)
+                if not self.nullable[symbol]:
+                    break
+        self.propagate(self.first, feeds, ~self.null_bit)
+        for nt in range(count):
+            if self.nullable[nt]:
+                self.first[nt] |= self.null_bit
+
+    def compute_follow_sets(self):
+        """FOLLOW位图：自右向左扫描右部得到后继的FIRST，可达末尾时依赖左部FOLLOW"""
+        count = len(self.nt_names)
+        self.follow = [0] * count
+        self.follow[0] = self.end_bit
+        feeds = [set() for _ in range(count)]
+        for left, right in self.encoded:
+            trailer = 0
+            reaches_end = True
+            for symbol in reversed(right):
+                if symbol < 0:
+                    trailer = 1 << ~symbol
+                    reaches_end = False
+                    continue
+                self.follow[symbol] |= trailer
+                if reaches_end and symbol != left:
+                    feeds[left].add(symbol)
+                first = self.first[symbol] & ~self.null_bit
+                if self.nullable[symbol]:
+                    trailer |= first
+                else:
+                    trailer = first
+                    reaches_end = False
+        self.propagate(self.follow, feeds)
+
+    def compute_predict_sets(self):
+        """PREDICT集合由FIRST/FOLLOW直接得出，无需迭代"""
+        for num, (left, right) in enumerate(self.encoded, 1):
+            bits = 0
+            for symbol in right:
+                if symbol == self.null_code:
+                    bits |= self.follow[left]
+                    break
+                if symbol < 0:
+                    bits |= 1 << ~symbol
+                    break
+                bits |= self.first[symbol] & ~self.null_bit
+                if not self.nullable[symbol]:
+                    break
             else:
-                self.predict_sets[entry_id] = self.predict_sets[entry_id].union(
-                    self.follow_sets[production[0]]
-                )
-        else:
-            self.predict_sets[entry_id] = self.predict_sets[entry_id].union(
-                self.first_sets[production[current_pos]]
-            )
+                bits |= self.follow[left]
+            self.predict_sets[num] = self.decode(bits)
 
-    def initialize_collections(self):
-        """初始化所有集合"""
-        # 创建初始空集合
-        for nt in self.productions:
-            if nt[0] not in self.first_sets.keys():
-                self.first_sets.update({nt[0]: set()})
-                self.follow_sets.update({nt[0]: set()})
-            if nt[2] in self.terminals:
-                self.first_sets[nt[0]].add(nt[2])
-        # print(self.first_sets)
-
-    def compute_first_sets(self, terminals):
-        """迭代计算FIRST集合直到稳定"""
-        prev_state = copy.copy(self.first_sets)
-        while True:
-            for prod in self.productions:
-                if prod[2] not in terminals:
-                    self.compute_first_for_production(prod, terminals)
-            if prev_state == self.first_sets:
-                break
-            prev_state = copy.copy(self.first_sets)
-
-    def compute_follow_sets(self, terminals):
-        """迭代计算FOLLOW集合直到稳定"""
-        self.follow_sets.update({self.productions[0][0]: {"#"}})
-        prev_state = copy.copy(self.follow_sets)
-        while True:
-            for prod in self.productions:
-                for pos in range(2, len(prod)):
-                    if prod[pos] in self.non_terminals:
-                        self.update_follow_for_symbol(prod, pos, terminals)
-            if prev_state == self.follow_sets:
-                break
-            prev_state = copy.copy(self.follow_sets)
-
-    def compute_predict_sets(self, terminals):
-        num = 1
-        prev_state = copy.copy(self.predict_sets)
-        while True:
-            for prod in self.productions:
-                if num not in self.predict_sets.keys():
-                    self.predict_sets.update({num: set()})
-                self.compute_predict(prod, num, terminals)
-                num = num + 1
-            if prev_state == self.predict_sets:
-                break
-            prev_state = copy.copy(self.predict_sets)
-            num = 1
-
-    def analyze_grammar(
-        self,
-        file_path=os.path.join(
-            os.path.dirname(os.path.realpath(__file__)), "./data/grammar.txt"
-        ),
-    ):
+    def analyze_grammar(self, file_path=DEFAULT_GRAMMAR):
         """主分析流程"""
         # 读取文法文件
         with open(file_path) as f:
@@ -167,19 +162,162 @@ class GrammarAnalyzer:
         self.terminals = self.terminals - self.non_terminals
         # print(self.terminals)
 
-        # 初始化数据结构
-        self.initialize_collections()
-        # print(self.first_sets)
-        # 计算各集合
-        self.compute_first_sets(self.terminals)
-        self.compute_follow_sets(self.terminals)
-        self.compute_predict_sets(self.terminals)
-        # print(self.first_sets)
-        # print(self.follow_sets)
-        # print(self.predict_sets)
+        # 符号编号后依次计算各集合
+        self.index_symbols()
+        self.compute_nullable()
+        self.compute_first_sets()
+        self.compute_follow_sets()
+        self.compute_predict_sets()
+        for nt, first, follow in zip(self.nt_names, self.first, self.follow):
+            self.first_sets[nt] = self.decode(first)
+            self.follow_sets[nt] = self.decode(follow)
         return self.predict_sets, self.non_terminals, self.terminals
 
 
+def read_productions(grammar_path):
+    """读取产生式，右部保持文法文件中的符号顺序"""
+    grammar = []
+    with open(grammar_path) as f:
+        for line in f.readlines():
+            parts = line.strip().split(" ", 20)  # 保持最大分割数
+            grammar.append({"left": parts[0], "right": parts[2:]})
+    return grammar
+
+
+class GrammarTables:
+    """一份文法的全部分析结果：预测集、符号集合、产生式与稠密LL1分析表
+
+    符号统一编号：非终结符按首次出现的顺序为0..nt_count-1，即分析表的行号；
+    终结符编号为nt_count+列号。分析表为nt_count*width的array("h")，
+    元素为产生式下标，-1表示出错。
+    """
+
+    # 缓存中保存的字段，均为数组、列表、字典等普通数据
+    FIELDS = (
+        "predict",
+        "non_terminals",
+        "terminals",
+        "grammar",
+        "term_names",
+        "nt_count",
+        "width",
+        "symbol_names",
+        "symbol_ids",
+        "columns",
+        "table",
+        "expected",
+        "follow",
+        "push_symbols",
+        "right_lengths",
+    )
+
+    def __init__(self, grammar_path=DEFAULT_GRAMMAR):
+        analyzer = GrammarAnalyzer()
+        self.predict, self.non_terminals, self.terminals = analyzer.analyze_grammar(
+            grammar_path
+        )
+        self.grammar = read_productions(grammar_path)
+
+        nt_names = list(dict.fromkeys(rule["left"] for rule in self.grammar))
+        columns = set(self.terminals).union(*self.predict.values())
+        self.term_names = sorted(columns)
+        self.nt_count = len(nt_names)
+        self.width = len(self.term_names)
+        self.symbol_names = nt_names + self.term_names
+        self.symbol_ids = {name: i for i, name in enumerate(self.symbol_names)}
+        self.columns = {name: i for i, name in enumerate(self.term_names)}
+
+        self.table = array("h", [-1]) * (self.nt_count * self.width)
+        for idx, rule in enumerate(self.grammar):
+            row = self.symbol_ids[rule["left"]] * self.width
+            for symbol in self.predict[idx + 1]:  # 注意predict的起始索引
+                self.table[row + self.columns[symbol]] = idx
+        # 每个非终结符可接受的终结符列号：各产生式PREDICT集合之并，
+        # 即FIRST集合与可空时的FOLLOW集合
+        self.expected = [
+            frozenset(
+                col
+                for col in range(self.width)
+                if self.table[row * self.width + col] != -1
+            )
+            for row in range(self.nt_count)
+        ]
+        # 非终结符FOLLOW集合中的终结符列号（输入结束符"#"不对应任何列）
+        self.follow = [
+            frozenset(
+                self.columns[t] for t in analyzer.follow_sets[name] if t in self.columns
+            )
+            for name in nt_names
+        ]
+
+        # 产生式右部按压栈顺序（逆序、去掉NULL）编码；长度仍按原右部计算
+        self.push_symbols = [
+            tuple(self.symbol_ids[s] for s in reversed(rule["right"]) if s != "NULL")
+            for rule in self.grammar
+        ]
+        self.right_lengths = [len(rule["right"]) for rule in self.grammar]
+
+    def to_data(self):
+        """缓存用的普通数据：字段名到字段值的字典"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_data(cls, data):
+        """由to_data()的结果恢复，不重新分析文法"""
+        tables = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(tables, name, data[name])
+        return tables
+
+    def token_columns(self, type_names):
+        """Token类型编号到分析表列号的转换表，不属于终结符的类型为-1"""
+        return array("h", [self.columns.get(name, -1) for name in type_names])
+
+
+def _cache_path(grammar_path):
+    cache_dir = os.path.join(os.path.dirname(grammar_path), "__pycache__")
+    return os.path.join(cache_dir, os.path.basename(grammar_path) + ".tables.pickle")
+
+
+def _tables_digest(grammar_path):
+    # 文法内容、本模块源码（分析算法与表结构）与缓存字段共同决定缓存是否有效
+    digest = hashlib.sha256()
+    with open(grammar_path, "rb") as f:
+        digest.update(f.read())
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    digest.update(repr((CACHE_VERSION, GrammarTables.FIELDS)).encode())
+    return digest.hexdigest()
+
+
+def load_tables(grammar_path=DEFAULT_GRAMMAR):
+    """返回文法的GrammarTables，按文法内容的哈希读取或重建磁盘缓存"""
+    digest = _tables_digest(grammar_path)
+    cache_path = _cache_path(grammar_path)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        # 缓存为(哈希, 字段字典)；旧格式或哈希不同时重建
+        if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == digest:
+            return GrammarTables.from_data(cached[1])
+    except (OSError, pickle.UnpicklingError, EOFError):
+        # 缓存不存在或已损坏时直接重建
+        pass
+
+    tables = GrammarTables(grammar_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, "wb") as f:
+            data = (digest, tables.to_data())
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # 原子替换，多个进程同时重建时互不干扰
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return tables
+
 """
 if __name__ == '__main__':
     analyzer = GrammarAnalyzer()
@@ -1,12 +1,12 @@
 import copy
-import json
 import re
 import sys
 import os
+from types import GeneratorType
 from typing import List, Dict, Any
 
-# 提高递归深度限制
-sys.setrecursionlimit(3000)
+from SemanticTypes import array, basic, compatible, describe, record
+from SyntaxTree import Node
 
 
 def handle_index_error(exc_type, exc_value, exc_traceback):
@@ -21,111 +21,71 @@ sys.excepthook = handle_index_error
 flag = False
 
 
-class Node:
+def create_node(val: str) -> Node:
+    """
+    由.ast文件中的一行生成节点
+    :param val: 去掉缩进的行内容
+    :return: 节点对象
+    """
+    parts = val.split()
+    node = Node(parts[0], int(parts[1]))
+    remaining = parts[2:]
 
-    def __init__(self, line, val, depth):
-        """
-        初始化节点对象
-        :param line: 行号
-        :param val: 节点值
-        :param depth: 节点深度
-        """
-        self.child = []
-        self.val = val
-        self.depth = depth
-        self.line = str(line + 1)
-        self._init_base_attributes()
-        self._parse_value(val)
-
-    def _init_base_attributes(self) -> None:
-        """初始化所有节点的基本属性"""
-        self.nodeKind = ""
-        self.kind = ""
-        self.idnum: int = 0
-        self.name = []
-        self.attr = {}
-        self.rawline: str = ""
-        self.realKind: str = ""
-
-    def _parse_value(self, val: str) -> None:
-        """主解析方法"""
-        parts = val.split()
-        self.nodeKind = parts[0]
-        self.rawline = str(int(parts[1]) + 1)
-        remaining = parts[2:]
-
-        # 使用分派模式处理不同节点类型
-        parser = {
-            "DecK": self._parse_dec,
-            "StmtK": self._parse_stmt,
-            "ExpK": self._parse_exp,
-        }.get(self.nodeKind, self._parse_default)
-
-        remaining = parser(remaining)
-        self._process_remaining_identifiers(remaining)
-
-    def _parse_dec(self, vals: List[str]) -> List[str]:
-        """处理声明类型节点"""
-        # 处理参数类型前缀
-        if vals and vals[0] in ("valparamType", "varparamType"):
-            self.attr["paramt"] = vals[0]
-            vals = vals[1:]
-
-        self.kind = vals[0]
+    # 使用分派模式处理不同节点类型
+    parser = _NODE_PARSERS.get(node.nodeKind)
+    if parser:
+        remaining = parser(node, remaining)
+
+    # 处理剩余标识符
+    node.name = [x for x in remaining if x]
+    node.idnum = len(node.name)
+    return node
+
+
+def _parse_dec(node: Node, vals: List[str]) -> List[str]:
+    """处理声明类型节点"""
+    # 处理参数类型前缀
+    if vals and vals[0] in ("valparamType", "varparamType"):
+        node.paramt = vals[0]
         vals = vals[1:]
 
-        # 处理特殊类型
-        if self.kind == "IdK":
-            self.realKind = vals[0]
-            vals = vals[1:]
-
-        # 处理数组类型
-        if self.kind == "ArrayK":
-            self.attr.update({"low": vals[0], "up": vals[1], "childType": vals[2]})
-            vals = vals[3:]
-        return vals
-
-    def _parse_stmt(self, vals: List[str]) -> List[str]:
-        """处理语句类型节点"""
-        if vals:
-            self.kind = vals[0]
-            return vals[1:]
-        return vals
-
-    def _parse_exp(self, vals: List[str]) -> List[str]:
-        """处理表达式类型节点"""
-        if vals:
-            self.kind = vals[0]
-            vals = vals[1:]
-
-        # 处理变量类型
-        if vals and vals[0] in ("IdV", "ArrayMembV", "FieldMembV"):
-            self.attr["varkind"] = vals[0]
-            vals = vals[1:]
-
-        # 处理操作符和常量
-        if self.kind == "OpK" and vals:
-            self.attr["op"] = vals[0]
-        elif self.kind == "ConstK" and vals:
-            self.attr["val"] = vals[0]
-        return vals
-
-    def _parse_default(self, vals: List[str]) -> List[str]:
-        """默认解析处理"""
-        return vals
-
-    def _process_remaining_identifiers(self, vals: List[str]) -> None:
-        """处理剩余标识符"""
-        self.name = [x for x in vals if x]
-        self.idnum = len(self.name)
-
-    def __str__(self) -> str:
-        """简化字符串表示"""
-        return str(self.__dict__)
+    node.kind = vals[0]
+    vals = vals[1:]
+
+    # 处理特殊类型
+    if node.kind == "IdK":
+        node.realKind = vals[0]
+        vals = vals[1:]
+
+    # 处理数组类型
+    if node.kind == "ArrayK":
+        node.low, node.up, node.childType = vals[0], vals[1], vals[2]
+        vals = vals[3:]
+    return vals
 
-    def print(self) -> None:
-        """结构化打印方法"""
-        print(str(json.dumps(self.__dict__)))
+
+def _parse_stmt(node: Node, vals: List[str]) -> List[str]:
+    """处理语句类型节点"""
+    if vals:
+        node.kind = vals[0]
+        return vals[1:]
+    return vals
+
+
+def _parse_exp(node: Node, vals: List[str]) -> List[str]:
+    """处理表达式类型节点"""
+    if vals:
+        node.kind = vals[0]
+        vals = vals[1:]
+
+    # 处理变量类型
+    if vals and vals[0] in ("IdV", "ArrayMembV", "FieldMembV"):
+        node.varkind = vals[0]
+        vals = vals[1:]
+    return vals
+
+
+_NODE_PARSERS = {"DecK": _parse_dec, "StmtK": _parse_stmt, "ExpK": _parse_exp}
 
 
 class DefaultKind:
@@ -149,10 +109,10 @@ class Kind:
         self.kind = node.kind
         self.size = 0
         if node.kind == "ArrayK":
-            indexTy = {"low": node.attr["low"], "up": node.attr["up"]}
-            elemTy = Kind(DefaultKind(node.attr["childType"])).__dict__
+            indexTy = {"low": node.low, "up": node.up}
+            elemTy = Kind(DefaultKind(node.childType)).__dict__
             self.arrayAttr = {"indexTy": indexTy, "elemTy": elemTy}
-            self.size = elemTy["size"] * (int(node.attr["up"]) - int(node.attr["low"]))
+            self.size = elemTy["size"] * (int(node.up) - int(node.low))
             self.arrayKind = elemTy["kind"]
         if node.kind == "RecordK":
             if body:
@@ -168,6 +128,49 @@ class Kind:
         return str(self.__dict__)
 
 
+# 驻留的类型描述：结构相同的类型共用同一个Kind对象，创建后不再修改
+_interned_kinds = {}
+
+
+def intern_kind(node, body=None):
+    """
+    取得与node类型结构相同的共享类型描述
+    :param node: 节点对象
+    :param body: 记录类型的字段列表
+    :return: Kind对象
+    """
+    if node.kind == "ArrayK":
+        key = (node.kind, node.low, node.up, node.childType)
+    elif node.kind == "RecordK":
+        key = (node.kind, sum(x.size for x in body) if body else 0)
+    else:
+        key = (node.kind,)
+    kind = _interned_kinds.get(key)
+    if kind is None:
+        kind = _interned_kinds[key] = Kind(node, body)
+    return kind
+
+
+def kind_type(kind):
+    """
+    由Kind得到对应的结构化类型（记录类型见FieldList.type）
+    :param kind: Kind对象
+    :return: SnlType对象
+    """
+    if kind.kind == "ArrayK":
+        index = kind.arrayAttr["indexTy"]
+        return array(index["low"], index["up"], basic(kind.arrayKind))
+    return basic(kind.kind)
+
+
+class FieldList(list):
+    """记录类型的字段Kind列表，type为对应的结构化记录类型（含字段名索引）"""
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        self.type = record((entry.name, kind_type(entry)) for entry in entries)
+
+
 class SymbolTable:
 
     def __init__(self, node, name, level, off, body=None, params=None, is_type=False):
@@ -189,7 +192,7 @@ class SymbolTable:
         self.params = params
         self.is_type = is_type
         self.body = self._process_body(body, node, name)
-        self.typePtr = Kind(node, self.body)
+        self.typePtr = intern_kind(node, self.body)
 
     def _process_body(self, body, node, name):
         """处理 body 数据，检查字段名重复并生成符号条目"""
@@ -212,7 +215,7 @@ class SymbolTable:
                 seen_names.add(field_name)
                 entries.append(self._create_entry(field_node, field_name))
 
-        return entries
+        return FieldList(entries)
 
     def _create_entry(self, field_node, field_name):
         """创建类型条目并设置字段名"""
@@ -235,7 +238,11 @@ class SymbolTable:
 
 # 全局作用域和当前作用域
 all_scope = [[]]
-scope = [[]]
+scope = [[]]  # 当前可见的各层条目，退出作用域时据此撤销索引
+# (名称, 是否为类型) -> 可见的同名条目栈[(作用域层数, 层内序号, 条目)]
+symbols = {}
+# 过程条目 -> 形参列表[(结构化类型, 是否按引用传递)]
+signatures = {}
 sl = 0
 off = 0
 
@@ -261,10 +268,31 @@ def dfs(node):
     深度优先遍历节点
     :param node: 节点对象
     """
-    for child in node.child:
-        print(f"{node.val} -> {child.val}")
-    for child in node.child:
-        dfs(child)
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        for child in node.child:
+            print(f"{node.nodeKind} {node.kind} -> {child.nodeKind} {child.kind}")
+        pending.extend(reversed(node.child))
+
+
+def iter_ast_lines(tree_path, chunk_size=1 << 18):
+    """
+    按块读取.ast文件，逐行生成(缩进层数, 去掉缩进的行内容)
+    :param tree_path: 文件路径
+    :param chunk_size: 每次读取的字符数
+    """
+    with open(tree_path) as file:
+        rest = ""
+        while chunk := file.read(chunk_size):
+            lines = (rest + chunk).split("\n")
+            rest = lines.pop()  # 不完整的最后一行留到下一块
+            for line in lines:
+                content = line.lstrip(" ")
+                yield (len(line) + 1 - len(content)) // 3, content
+        if rest:
+            content = rest.lstrip(" ")
+            yield (len(rest) - len(content)) // 3, content
 
 
 def generate_node(tree_path):
@@ -273,25 +301,26 @@ def generate_node(tree_path):
     :param tree_path: 文件路径
     :return: 根节点
     """
-    hierarchy = {}
-    with open(tree_path) as file:
-        for line_num, line in enumerate(file):
-            line_content = line.rstrip("\n").lstrip(" ")
-            indent_level = (len(line) - len(line_content)) // 3
-
-            if line_content == "StmLK":
-                continue
+    root = None
+    path = []  # 各层最近读到的节点，当前节点的父节点为上一层的节点
+    for indent_level, line_content in iter_ast_lines(tree_path):
+        if line_content == "StmLK":
+            continue
 
-            current_node = Node(line_num, line_content, indent_level)
-            hierarchy.setdefault(indent_level, []).append(current_node)
+        current_node = create_node(line_content)
+        if indent_level < len(path):
+            path[indent_level] = current_node
+        else:
+            path.extend([None] * (indent_level - len(path)))
+            path.append(current_node)
 
-            if indent_level > 0:
-                parent_level = indent_level - 1
-                if parent_level in hierarchy:
-                    parent = hierarchy[parent_level][-1]
-                    parent.child.append(current_node)
+        if indent_level == 0:
+            if root is None:
+                root = current_node
+        elif path[indent_level - 1] is not None:
+            path[indent_level - 1].child.append(current_node)
 
-    return hierarchy[0][0] if hierarchy else None
+    return root
 
 
 def CallSymbolTable(node, name, level, off, body=None, params=None, is_type=False):
@@ -324,8 +353,8 @@ def CallSymbolTable(node, name, level, off, body=None, params=None, is_type=Fals
         error(node.rawline, f"unknown kind: {node.realKind}")
         return None
 
-    # 克隆类型条目并设置属性
-    symbol_table = copy.deepcopy(type_entry)
+    # 浅复制类型条目：类型描述与记录字段共享，只有变量自身的属性单独保存
+    symbol_table = copy.copy(type_entry)
     symbol_table.is_type = False
     symbol_table.name = name
     return symbol_table
@@ -339,12 +368,29 @@ def find(name, exist=None, type_flag=False):
     :param type_flag: 是否为类型标志
     :return: 符号表条目
     """
-    low = sl - 1 if exist is not None else -1
-    for i in range(sl, low, -1):
-        for entry in reversed(scope[i]):
-            if entry.name == name and entry.is_type == type_flag:
-                return entry
-    return None
+    entries = symbols.get((name, type_flag))
+    if not entries:
+        return None
+    level, _, entry = entries[-1]
+    if exist is not None and level != sl:
+        return None
+    return entry
+
+
+def find_visible(name):
+    """
+    查找当前可见的最近声明的同名符号，不区分是否为类型
+    :param name: 符号名称
+    :return: 符号表条目
+    """
+    found = [
+        entries[-1]
+        for entries in (symbols.get((name, False)), symbols.get((name, True)))
+        if entries
+    ]
+    if not found:
+        return None
+    return max(found, key=lambda item: item[:2])[2]
 
 
 # 使用字典存储类型验证规则，提升可维护性
@@ -368,23 +414,34 @@ def validate_kind(kind, vkind):
 def get_field_kind(field):
     """
     获取字段类型
-    :param field: 字段对象
+    :param field: 字段的结构化类型
     :return: 字段类型
     """
     if field.kind in ("IntegerK", "CharK"):
         return field.kind
     if field.kind == "ArrayK":
-        return field.arrayKind
+        return field.elem.kind
     return None
 
 
+def type_of(symbol):
+    """
+    获取符号的结构化类型
+    :param symbol: 符号表条目
+    :return: SnlType对象
+    """
+    if symbol.kind == "RecordK":
+        return symbol.body.type if symbol.body is not None else record(())
+    return kind_type(symbol.typePtr)
+
+
 def create_name(node):
     """
     生成复合名称
     :param node: 节点对象
     :return: 复合名称
     """
-    if node.attr.get("varkind") == "FieldMembV":
+    if node.varkind == "FieldMembV":
         return f"{node.name[0]}.{node.child[0].name[0]}"
     return node.name[0]
 
@@ -424,7 +481,7 @@ def _handle_identifier(node):
     :param node: 节点对象
     :return: 标识符类型
     """
-    kind = node.attr["varkind"]
+    kind = node.varkind
     symbol = find(node.name[0])
 
     if not symbol:
@@ -457,7 +514,7 @@ def _handle_array(node, symbol):
         return None
 
     index_node = node.child[0]
-    index_type = getKind(index_node)
+    index_type = yield getKind(index_node)
 
     # 验证索引类型
     if not index_type or index_type != "IntegerK":
@@ -481,19 +538,19 @@ def _handle_record(node, symbol):
     :return: 记录成员类型
     """
     member_name = node.child[0].name[0]
-    member = next((x for x in symbol.body if x.name == member_name), None)
+    member = type_of(symbol).members.get(member_name)
 
     if not member:
         error(node.rawline, f"记录 {node.name[0]} 缺少成员 {member_name}")
         return None
 
-    if not validate_kind(node.child[0].attr["varkind"], member.kind):
+    if not validate_kind(node.child[0].varkind, member.kind):
         error(node.rawline, "成员类型不匹配:", member_name, member.kind)
         return None
 
     # 生成子节点符号表
     for child in node.child[0].child:
-        generate_table(child)
+        yield generate_table(child)
 
     return get_field_kind(member)
 
@@ -507,7 +564,9 @@ def operator(node, op):
     """
     global sl, scope, off
 
-    operand_kinds = [generate_table(x) for x in node.child]
+    operand_kinds = []
+    for x in node.child:
+        operand_kinds.append((yield generate_table(x)))
     if None in operand_kinds:
         return None
 
@@ -530,7 +589,7 @@ def generate_table(node):
     """
     生成符号表
     :param node: 节点对象
-    :return: 节点类型
+    :return: 节点类型，或得到节点类型的分析过程（生成器，见evaluate）
     """
     global sl, scope, off
     node_handlers = {
@@ -544,6 +603,32 @@ def generate_table(node):
     return handler(node)
 
 
+def evaluate(task):
+    """
+    执行分析过程并返回结果
+    分析过程是生成器，用yield交出子过程并取得其结果；这里用显式栈依次执行，
+    访问顺序与递归调用相同，语法树再深也不会超出Python的递归深度限制
+    :param task: 分析过程，或已经得到的结果
+    :return: 分析结果
+    """
+    if not isinstance(task, GeneratorType):
+        return task
+    tasks = [task]
+    value = None
+    while tasks:
+        try:
+            task = tasks[-1].send(value)
+        except StopIteration as stop:
+            tasks.pop()
+            value = stop.value
+            continue
+        if isinstance(task, GeneratorType):
+            tasks.append(task)
+            value = None
+        else:
+            value = task
+
+
 def handle_record(node):
     """
     处理记录类型声明
@@ -592,7 +677,7 @@ def handle_declaration(node):
         update_scope(entry)
 
         for child in node.child:
-            generate_table(child)
+            yield generate_table(child)
 
 
 def handle_procedure(node):
@@ -602,38 +687,43 @@ def handle_procedure(node):
     """
     global sl, scope, off
     if node.idnum <= 0:
-        handle_default(node)
+        yield handle_default(node)
         return
 
     if check_duplicate(node.name[0], node.rawline, "proc"):
         return
 
-    # 收集形式参数
+    # 收集形式参数：params为输出到.sem的文字描述，signature用于检查调用
     params = []
+    signature = []
     for child in node.child:
         if child.nodeKind == "DecK":
+            # 与.sem中的形参描述一致：数组、记录形参不按var形参检查
+            by_ref = child.paramt == "varparamType" and child.kind not in (
+                "ArrayK",
+                "RecordK",
+            )
+            declared = (param_type(child), by_ref)
             if child.kind == "ArrayK":
                 for name in child.name:
                     if name != " " and name != "":
+                        signature.append(declared)
                         params.append(
                             {
                                 "kind": child.kind
                                 + " "
-                                + child.attr["low"]
+                                + child.low
                                 + " "
-                                + child.attr["up"]
+                                + child.up
                                 + " "
-                                + child.attr["childType"],
+                                + child.childType,
                                 "name": name,
                             }
                         )
             else:
                 for name in child.name:
                     if name != " " and name != "":
-                        if (
-                            "paramt" in child.attr
-                            and child.attr["paramt"] == "varparamType"
-                        ):
+                        if child.paramt == "varparamType":
                             if child.kind != "RecordK":
                                 tmpkind = child.kind + "var"
                             else:
@@ -647,13 +737,14 @@ def handle_procedure(node):
                                 if ch.kind == "ArrayK":
                                     tmpkind += (
                                         " ArrayK"
-                                        + ch.attr["low"]
+                                        + ch.low
                                         + " "
-                                        + ch.attr["up"]
+                                        + ch.up
                                         + " "
-                                        + ch.attr["childType"]
+                                        + ch.childType
                                     )
 
+                        signature.append(declared)
                         params.append({"kind": tmpkind, "name": name})
     node.kind = "ProcDecK"
     # 创建符号表条目
@@ -664,14 +755,33 @@ def handle_procedure(node):
         return
 
     update_scope(entry)
+    signatures[entry] = signature
 
     # 进入新的作用域处理过程体
     enter_scope()
     for child in node.child:
-        generate_table(child)
+        yield generate_table(child)
     exit_scope()
 
 
+def param_type(node):
+    """
+    获取形参声明的结构化类型
+    :param node: 形参声明节点
+    :return: SnlType对象，类型名未定义时为None
+    """
+    if node.kind == "ArrayK":
+        return array(node.low, node.up, basic(node.childType))
+    if node.kind == "RecordK":
+        return record(
+            (name, param_type(field)) for field in node.child for name in field.name
+        )
+    if node.kind == "IdK":
+        type_entry = find(node.realKind, type_flag=True)
+        return type_of(type_entry) if type_entry else None
+    return basic(node.kind)
+
+
 def handle_statement(node):
     """
     处理语句节点
@@ -686,7 +796,7 @@ def handle_statement(node):
         "WhileK": handle_loop,
     }
     handler = stmt_handlers.get(node.kind, lambda n: None)
-    handler(node)
+    yield handler(node)
 
 
 def handle_expression(node):
@@ -709,7 +819,7 @@ def handle_type(node):
     global sl, scope, off
     for child in node.child:
         if child.kind == "RecordK":
-            generate_table(child)
+            yield generate_table(child)
             continue
 
         if check_duplicate(child.name[0], node.rawline, "type"):
@@ -744,6 +854,9 @@ def update_scope(entry):
     else:
         entry.off = 0
 
+    symbols.setdefault((entry.name, entry.is_type), []).append(
+        (sl, len(scope[sl]), entry)
+    )
     scope[sl].append(entry)
     all_scope[sl].append(entry)
 
@@ -774,8 +887,12 @@ def enter_scope():
 def exit_scope():
     """退出当前作用域"""
     global sl, scope, off
+    for entry in scope.pop():
+        entries = symbols[(entry.name, entry.is_type)]
+        entries.pop()
+        if not entries:
+            del symbols[(entry.name, entry.is_type)]
     sl -= 1
-    scope = scope[:-1]
 
 
 # 语句处理子模块
@@ -794,65 +911,34 @@ def handle_call(node):
         error(node.rawline, "procDeck kind error:", node.name[0], proc.kind)
         return
 
-    params = []
+    # 实参列表[(结构化类型, 是否为值)]，常量与表达式不能传给var形参
+    args = []
     for param_node in node.child:
-        param_type = None
+        arg_type = None
+        is_value = param_node.kind in ("OpK", "ConstK")
         if param_node.kind == "OpK":
-            param_type = operator(param_node, param_node.name[0])
-            param_type += "!!"
+            kind = yield operator(param_node, param_node.name[0])
         else:
-            low = -1
-            flag = False
-            for i in range(sl, low, -1):
-                if flag:
-                    break
-                for entry in reversed(scope[i]):
-                    if str(entry.name) == str(param_node.name[0]):
-                        flag = True
-                        if (
-                            entry.kind == "ArrayK"
-                            and param_node.attr["varkind"] == "IdV"
-                        ):
-                            param_type = (
-                                "ArrayK"
-                                + " "
-                                + entry.typePtr.arrayAttr["indexTy"]["low"]
-                                + " "
-                                + entry.typePtr.arrayAttr["indexTy"]["up"]
-                                + " "
-                                + entry.typePtr.arrayAttr["elemTy"]["kind"]
-                            )
-                        if (
-                            entry.kind == "RecordK"
-                            and param_node.attr["varkind"] == "IdV"
-                        ):
-                            param_node.attr["varkind"] = "FieldMembV"
-                            param_type = "RecordK"
-                            for body in entry.body:
-                                if body.kind == "IntegerK":
-                                    param_type += " IntegerK"
-                                else:
-                                    param_type += (
-                                        " ArrayK"
-                                        + body.arrayAttr["indexTy"]["low"]
-                                        + " "
-                                        + body.arrayAttr["indexTy"]["up"]
-                                        + " "
-                                        + body.arrayAttr["elemTy"]["kind"]
-                                    )
-
-                        break
-
-            if not param_type:
-                param_type = getKind(param_node)
-                if param_node.kind == "ConstK":
-                    param_type += "!!"
-        if not param_type:
+            kind = None
+            entry = find_visible(param_node.name[0])
+            if (
+                entry is not None
+                and entry.kind in ("ArrayK", "RecordK")
+                and param_node.varkind == "IdV"
+            ):
+                if entry.kind == "RecordK":
+                    param_node.varkind = "FieldMembV"
+                arg_type = type_of(entry)
+            else:
+                kind = yield getKind(param_node)
+        if kind:
+            arg_type = basic(kind)
+        if arg_type is None:
             error(param_node.rawline, "Invalid parameter type")
             return
-        params.append(param_type)
+        args.append((arg_type, is_value))
 
-    validate_parameters(proc, params, node.rawline)
+    validate_parameters(proc, args, node.rawline)
 
 
 def handle_conditional(node):
@@ -862,7 +948,7 @@ def handle_conditional(node):
     """
     global sl, scope, off
     for child in node.child:
-        generate_table(child)
+        yield generate_table(child)
 
 
 def handle_assignment(node):
@@ -901,7 +987,7 @@ def handle_loop(node):
     :param node: 节点对象
     """
     for child in node.child:
-        generate_table(child)
+        yield generate_table(child)
 
 
 # 验证模块
@@ -921,26 +1007,35 @@ def validate_procedure(proc, node):
     return True
 
 
-def validate_parameters(proc, params, line):
+def validate_parameters(proc, args, line):
     """
     验证过程参数是否匹配
     :param proc: 过程符号表条目
-    :param params: 参数列表
+    :param args: 实参列表[(结构化类型, 是否为值)]
     :param line: 行号
     """
     expected = [p["kind"] for p in proc.params]
-    if len(params) != len(expected):
-        error(line, "Parameter mismatch:", params, expected)
-    for i, _ in enumerate(params):
-        if expected[i][-3:] == "var" and params[i][-2:] == "!!":
-            error(line, "Parameter mismatch:", expected[i], params[i])
-        else:
-            if expected[i][-3:] == "var":
-                expected[i] = expected[i][:-3]
-            if params[i][-2:] == "!!":
-                params[i] = params[i][:-2]
-            if expected[i] != params[i]:
-                error(line, "Parameter mismatch:", expected[i], params[i])
+    signature = signatures.get(proc, [])
+    if len(args) != len(signature):
+        described = [describe_arg(arg) for arg in args]
+        error(line, "Parameter mismatch:", described, expected)
+    for i, (arg_type, is_value) in enumerate(args):
+        declared, by_ref = signature[i]
+        if by_ref and is_value:
+            error(line, "Parameter mismatch:", expected[i], describe_arg(args[i]))
+        elif not compatible(declared, arg_type):
+            kind = expected[i][:-3] if expected[i].endswith("var") else expected[i]
+            error(line, "Parameter mismatch:", kind, describe(arg_type))
+
+
+def describe_arg(arg):
+    """
+    实参的文字描述，值实参带!!标记
+    :param arg: (结构化类型, 是否为值)
+    :return: 描述字符串
+    """
+    arg_type, is_value = arg
+    return describe(arg_type) + "!!" if is_value else describe(arg_type)
 
 
 def handle_default(node):
@@ -949,7 +1044,7 @@ def handle_default(node):
     :param node: 节点对象
     """
     for child in node.child:
-        generate_table(child)
+        yield generate_table(child)
 
 
 def table_print(table):
@@ -967,10 +1062,13 @@ root = None
 
 def init():
     """初始化全局变量"""
-    global root, all_scope, sl, off, flag, scope
+    global root, all_scope, sl, off, flag, scope, symbols, signatures
     root = None
     all_scope = [[]]
     scope = [[]]
+    symbols = {}
+    signatures = {}
+    _interned_kinds.clear()
     sl = 0
     off = 0
     flag = False
@@ -986,7 +1084,7 @@ def semantic(tree_path, output_path):
     init()
     root = generate_node(tree_path)
     # visTree(root)  # 按需取消注释可视化
-    generate_table(root)
+    evaluate(generate_table(root))
 
     with open(output_path, "w") as f:
         for scope_level, scope in enumerate(all_scope):
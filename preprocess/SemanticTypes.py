@@ -0,0 +1,88 @@
+"""语义分析使用的结构化类型
+
+类型对象按结构驻留（hash-consing）：结构相同的类型总是同一个对象，
+判断两个类型是否相同只需比较对象本身。记录类型按字段名与字段类型驻留，
+但形参与实参只按字段类型比较（见compatible），与原先的字符串比较一致。
+过程的形参另外记录是否按引用传递（var），实参记录是否为值（常量或表达式），
+不再拼接字符串比较。
+"""
+
+
+class SnlType:
+    """驻留的类型对象，只能由basic/array/record创建，创建后不再修改
+
+    kind为IntegerK、CharK、ArrayK或RecordK等。数组类型有下标范围low/up
+    与元素类型elem；记录类型有按声明顺序排列的fields（(字段名, 类型)），
+    members为字段名到类型的索引。
+    """
+
+    __slots__ = ("kind", "low", "up", "elem", "fields", "members")
+
+    def __init__(self, kind, low=None, up=None, elem=None, fields=()):
+        self.kind = kind
+        self.low = low
+        self.up = up
+        self.elem = elem
+        self.fields = fields
+        self.members = {}
+        for name, field_type in fields:
+            self.members.setdefault(name, field_type)
+
+    def __repr__(self):
+        return f"SnlType({describe(self)})"
+
+
+_interned = {}
+
+
+def _intern(key, *args):
+    snl_type = _interned.get(key)
+    if snl_type is None:
+        snl_type = _interned[key] = SnlType(*args)
+    return snl_type
+
+
+def basic(kind):
+    """整型、字符型等没有内部结构的类型"""
+    return _intern((kind,), kind)
+
+
+def array(low, up, elem):
+    """数组类型，low/up为.ast中的下标上下界，elem为元素类型"""
+    return _intern(("ArrayK", low, up, elem), "ArrayK", low, up, elem)
+
+
+def record(fields):
+    """记录类型，fields为按声明顺序排列的(字段名, 类型)"""
+    fields = tuple(fields)
+    return _intern(("RecordK", fields), "RecordK", None, None, None, fields)
+
+
+def compatible(declared, actual):
+    """实参类型actual能否传给类型为declared的形参，记录类型不比较字段名"""
+    if declared is actual:
+        return True
+    if declared.kind != "RecordK" or actual.kind != "RecordK":
+        return False
+    return [t for _, t in declared.fields] == [t for _, t in actual.fields]
+
+
+INTEGER = basic("IntegerK")
+CHAR = basic("CharK")
+
+
+def describe(snl_type):
+    """类型的文字描述，与原先调用语句中拼接的实参类型相同，用于错误信息"""
+    if snl_type.kind == "ArrayK":
+        return f"ArrayK {snl_type.low} {snl_type.up} {snl_type.elem.kind}"
+    if snl_type.kind == "RecordK":
+        parts = ["RecordK"]
+        for _, field_type in snl_type.fields:
+            if field_type.kind == "ArrayK":
+                parts.append(
+                    f" ArrayK{field_type.low} {field_type.up} {field_type.elem.kind}"
+                )
+            else:
+                parts.append(f" {field_type.kind}")
+        return "".join(parts)
+    return snl_type.kind
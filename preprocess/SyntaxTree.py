@@ -1,4 +1,5 @@
 # 定义栈
+import copy
 import sys
 
 
@@ -29,39 +30,114 @@ class Stack:
         return len(self.items)
 
 
+class StackView:
+    """在Stack上模拟压栈与弹栈而不修改原栈：原栈元素只读共享，
+    新压入的元素保存在覆盖栈中，复制视图只需复制覆盖栈"""
+
+    def __init__(self, stack):
+        self.items = stack.items
+        self.depth = len(stack.items)  # 原栈中仍可见的元素个数
+        self.overlay = []
+
+    def isEmpty(self):
+        return not self.overlay and self.depth == 0
+
+    def push(self, item):
+        self.overlay.append(item)
+
+    def extend(self, items):
+        self.overlay.extend(items)
+
+    def pop(self):
+        if self.overlay:
+            return self.overlay.pop()
+        if self.depth == 0:
+            print("语法树生成有误")
+            sys.exit()
+        self.depth -= 1
+        return self.items[self.depth]
+
+    def top(self):
+        if self.overlay:
+            return self.overlay[-1]
+        if self.depth == 0:
+            print("语法树生成有误")
+            sys.exit()
+        return self.items[self.depth - 1]
+
+    def size(self):
+        return self.depth + len(self.overlay)
+
+    def fork(self):
+        clone = copy.copy(self)
+        clone.overlay = list(self.overlay)
+        return clone
+
+
 class Node:
+    """语法分析与语义分析共用的语法树节点
+
+    使用__slots__，不为每个节点分配属性字典。dec/stmt/exp为语法分析
+    按类别设置的具体类型（输出时取与nodeKind对应的一项；出错恢复后语法树栈
+    错位时，同一节点可能被设置多个类别），kind为语义分析从.ast读入的具体类型。
+    low/up/childType为数组类型属性，paramt为参数类型，varkind为变量类别，
+    realKind为类型名声明所引用的类型名，未使用的属性保持缺省值。
+    """
+
+    __slots__ = (
+        "nodeKind",  # Deck/SymtK/ExpK/prok----
+        "child",  # 子节点
+        "Sibling",  # 兄弟节点
+        "father",  # 父节点
+        "Lineno",  # 行数
+        "kind",  # 语义分析中的具体类型
+        "dec",  # 语法树节点具体类型
+        "stmt",
+        "exp",
+        "idnum",  # 标识符个数
+        "name",  # 标识符名
+        "judge",
+        "low",
+        "up",
+        "childType",
+        "paramt",
+        "varkind",
+        "realKind",
+    )
 
     def __init__(self, nodeKind, Lineno=0, judge=False):
-        self.nodeKind = nodeKind  # Deck/SymtK/ExpK/prok----
-        self.child = []  # 子节点
-        self.Sibling = None  # 兄弟节点
-        self.father = None  # 父节点
-        self.Lineno = Lineno  # 行数
-        self.kind = {"dec": " ", "stmt": " ", "exp": " "}  # 语法树节点具体类型
-        self.idnum = 0  # 标识符个数
-        self.name = []  # 标识符名
-
-        # 初始化属性结构
-        self.attr = [
-            {"low": 0, "up": 0, "childType": " "},  # ArrayAttr
-            {"paramt": " "},  # ProcAttr
-            {"op": " ", "val": 0, "varkind": " ", "type": " "},  # ExpAttr
-        ]
+        self.nodeKind = nodeKind
+        self.child = []
+        self.Sibling = None
+        self.father = None
+        self.Lineno = Lineno
+        self.kind = ""
+        self.dec = " "
+        self.stmt = " "
+        self.exp = " "
+        self.idnum = 0
+        self.name = []
         self.judge = judge
+        self.low = 0
+        self.up = 0
+        self.childType = " "
+        self.paramt = " "
+        self.varkind = " "
+        self.realKind = ""
+
+    @property
+    def rawline(self):
+        # 语义分析报错使用的行号
+        return str(self.Lineno + 1)
 
 
 class Tree(object):
     _VALID_OUTPUT_NODE_TYPES = {"TypeK", "VarK", "ProcK"}
-    _NODE_TYPE_MAP = {"ProcK": "ProcDecK"}
+    _NODE_TYPE_MAP = {"ProcK": "ProcDecK", "StmLKStmtK": "StmtK"}
 
-    def __init__(self):
+    def __init__(self, output=None):
         self.root = Node("ProK", judge=True)
-        self.stack = Stack()  # 语法树栈
-        self.NumStack = Stack()  # 操作数栈
-        self.SignStack = Stack()  # 操作符栈
-        self.getExpResult = True
-        self.getExpResult2 = False
-        self.expflag = 0
+        self.stack = Stack()  # 语法树栈，表达式子树由ExpressionParser生成
 
         # 初始化根节点子结构并反向压栈
         initial_children = [Node("PheadK"), Node("TypeK"), Node("StmLK")]
@@ -69,91 +145,142 @@ class Tree(object):
         for child in reversed(initial_children):
             self.stack.push(child)
 
-    def _build_node_line(self, node, indent_level):
-        """构建节点输出行内容"""
-        parts = []
-        if node.nodeKind == "StmLKStmtK":
-            parts = ["   " * (indent_level - 1)]
-            parts.extend(f"StmLK {str(node.Lineno)}\n")
-            node.nodeKind = "StmtK"
-        parts.extend(["   " * indent_level])
-        node_type = self._NODE_TYPE_MAP.get(node.nodeKind, node.nodeKind)
-        parts.extend([node_type, " ", str(node.Lineno)])
-
-        processing_map = {
-            "DecK": self._process_dec_node,
-            "StmtK": lambda n, p: p.extend([" ", n.kind["stmt"]]),
-            "ExpK": self._process_exp_node,
-        }
-        processor = processing_map.get(node.nodeKind)
-        if processor:
-            processor(node, parts)
-
-        # 处理标识符列表
-        parts.extend(f" {name}" for name in node.name[: node.idnum])
-        return "".join(parts)
-
-    def _process_dec_node(self, node, parts):
-        """处理声明类型节点"""
-        if node.attr[1]["paramt"] != " ":
-            parts.extend([" ", node.attr[1]["paramt"]])
-        parts.extend([" ", node.kind["dec"]])
-
-        if node.kind["dec"] == "ArrayK":
-            attr = node.attr[0]
-            parts.extend(
-                [" ", str(attr["low"]), " ", str(attr["up"]), " ", attr["childType"]]
-            )
-
-    def _process_exp_node(self, node, parts):
-        """处理表达式类型节点"""
-        parts.extend([" ", node.kind["exp"]])
-        if (varkind := node.attr[2]["varkind"]) != " ":
-            parts.extend([" ", varkind])
-
-    def getInfNode(self, TreePath, priJudge=False):
-        """输出语法树信息到文件"""
-        node_stack = Stack()
-        indent_stack = Stack()
-        node_stack.push(self.root)
-        indent_stack.push(0)
-
-        with open(TreePath, "w") as output_file:
-            while not node_stack.isEmpty():
-                current_node = node_stack.pop()
-                current_indent = indent_stack.pop()
-
-                # 构建节点行并确定输出条件
-                node_line = self._build_node_line(current_node, current_indent)
-                should_output = (
-                    current_node.judge
-                    or current_node.nodeKind in self._VALID_OUTPUT_NODE_TYPES
+        # 增量输出（output不为None时）：尚未输出部分的先序遍历栈与待写入的行
+        self.output = output
+        self.body = initial_children[2]  # 主程序的语句序列
+        self.pending = [(self.root, 0, False)]
+        self.buffer = []
+        # 某次emitBefore未找到节点后不再尝试增量输出，全部留到flush时输出
+        self.emitting = True
+
+    def _node_line(self, node, indent_level):
+        """构建节点输出行内容，不修改节点"""
+        indent = "   " * indent_level
+        kind = node.nodeKind
+        label = self._NODE_TYPE_MAP.get(kind, kind)
+        line = f"{indent}{label} {node.Lineno}"
+        formatter = self._FORMATTERS.get(label)
+        if formatter:
+            line += formatter(node)
+        if node.idnum:
+            line += "".join(f" {name}" for name in node.name[: node.idnum])
+        if kind == "StmLKStmtK":
+            # 语句序列的第一条语句，先输出所在的StmLK行
+            line = f"{indent[3:]}StmLK {node.Lineno}\n{line}"
+        return line
+
+    @staticmethod
+    def _format_dec(node):
+        """声明类型节点的附加信息"""
+        text = f" {node.dec}"
+        if node.paramt != " ":
+            text = f" {node.paramt}{text}"
+        if node.dec == "ArrayK":
+            text += f" {node.low} {node.up} {node.childType}"
+        return text
+
+    @staticmethod
+    def _format_stmt(node):
+        return f" {node.stmt}"
+
+    @staticmethod
+    def _format_exp(node):
+        """表达式类型节点的附加信息"""
+        if node.varkind != " ":
+            return f" {node.exp} {node.varkind}"
+        return f" {node.exp}"
+
+    # 输出类型名 -> 附加信息格式化函数
+    _FORMATTERS = {"DecK": _format_dec, "StmtK": _format_stmt, "ExpK": _format_exp}
+
+    def _traverse(self, pending, stop=None, visited=None):
+        """从pending继续先序遍历并生成输出行，到stop节点为止（stop留在pending中）
+
+        pending的元素为(节点, 缩进, 是否为过程声明之后的ProcDecK)，后者在
+        出栈时才判断是否为未使用的占位节点，使增量输出与一次性输出结果相同。
+        """
+        valid = self._VALID_OUTPUT_NODE_TYPES
+        while pending:
+            node, indent, optional = pending[-1]
+            if node is stop:
+                return
+            pending.pop()
+            if optional and not node.judge:
+                continue
+            if visited is not None:
+                visited.append(node)
+            if node.judge or node.nodeKind in valid:
+                yield self._node_line(node, indent)
+
+            # 兄弟节点在子节点之后处理
+            sibling = node.Sibling
+            if sibling:
+                optional = (
+                    node.nodeKind == "ProcDecK" and sibling.nodeKind == "ProcDecK"
                 )
+                pending.append((sibling, indent, optional))
+
+            # 子节点反向入栈保证正序处理
+            pending.extend((child, indent + 1, False) for child in reversed(node.child))
+
+    def lines(self):
+        """按先序依次生成语法树的输出行（不含换行符）"""
+        return self._traverse([(self.root, 0, False)])
+
+    def getInfNode(self, TreePath, priJudge=False, chunk_lines=4096):
+        """输出语法树信息，TreePath为文件路径或可写的文件对象
+
+        输出行先缓存，每chunk_lines行一次性写入。
+        """
+        if not hasattr(TreePath, "write"):
+            with open(TreePath, "w") as output_file:
+                self.getInfNode(output_file, priJudge, chunk_lines)
+            return
+
+        buffer = []
+        for line in self.lines():
+            if priJudge:
+                print(line)
+            buffer.append(line)
+            if len(buffer) >= chunk_lines:
+                buffer.append("")
+                TreePath.write("\n".join(buffer))
+                buffer.clear()
+        if buffer:
+            buffer.append("")
+            TreePath.write("\n".join(buffer))
+
+    def emitBefore(self, node, chunk_lines=4096):
+        """增量输出：写出先序位于node之前的部分并释放这些节点
+
+        由最外层过程声明的语义动作调用，此时之前的过程已分析完毕，
+        语法树栈中只剩主程序的语句序列。若node不在尚未输出部分的先序
+        路径上（出错恢复后语法树栈错位），则不输出，之后的调用也不再尝试，
+        其余部分都留到flush时处理，避免每个过程都重复遍历尚未输出的部分。
+        """
+        if self.output is None or not self.emitting:
+            return
+        pending, visited = list(self.pending), []
+        lines = list(self._traverse(pending, node, visited))
+        if not pending:
+            self.emitting = False
+            return
+        self.pending = pending
+        self.buffer.extend(lines)
+        if len(self.buffer) >= chunk_lines:
+            self._write_buffer()
+        # 断开已输出节点之间的引用，使其可以被回收
+        for done in visited:
+            done.Sibling = None
+            done.child = []
+
+    def flush(self):
+        """增量输出：分析结束后写出其余部分"""
+        self.buffer.extend(self._traverse(self.pending))
+        self._write_buffer()
 
-                if should_output:
-                    if priJudge:
-                        print(node_line)
-                    output_file.write(f"{node_line}\n")
-
-                # 处理兄弟节点
-                if current_node.Sibling:
-                    self._process_sibling(
-                        current_node, node_stack, indent_stack, current_indent
-                    )
-
-                # 处理子节点（反向入栈保证正序处理）
-                for child in reversed(current_node.child):
-                    node_stack.push(child)
-                    indent_stack.push(current_indent + 1)
-
-    def _process_sibling(self, node, node_stack, indent_stack, indent_level):
-        """兄弟节点处理逻辑"""
-        sibling = node.Sibling
-        is_proc_dec_pair = (
-            node.nodeKind == "ProcDecK"
-            and sibling.nodeKind == "ProcDecK"
-            and not sibling.judge
-        )
-        if not is_proc_dec_pair:
-            node_stack.push(sibling)
-            indent_stack.push(indent_level)
+    def _write_buffer(self):
+        if self.buffer:
+            self.buffer.append("")
+            self.output.write("\n".join(self.buffer))
+            self.buffer.clear()
@@ -0,0 +1,272 @@
+import copy
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from config import delimiters, reservedWords
+from LexicalaAnalyzer import token_entry
+
+# token_back_stack中表示“此步未消耗Token”的标记
+BACK = -1
+
+
+class Interner:
+    """字符串驻留表：名字与连续整数编号一一对应"""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = dict(zip(self.names, range(len(self.names))))
+
+    def intern(self, name):
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+
+# Token类型（即语法分析使用的终结符）与.tk中第二列种类的初始编号
+TOKEN_TYPES = [*reservedWords.values(), *delimiters, "ID", "INTC", "CHARC", "EOF"]
+TOKEN_KINDS = ["Other", "Reserved_word", "ID", "INTC", "CHARC", "ERROR", "EOF"]
+_SEM_TYPED_KINDS = {"ID", "INTC", "CHARC"}
+
+# 二进制Token文件：文件头之后依次为类型、种类、行号、词素四列定宽数组，
+# 最后是类型名、种类名与词素三个以换行分隔的UTF-8字符串池
+BINARY_MAGIC = b"SNLTKB"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<6sBc5I")  # 魔数 版本 字节序 Token数 三个字符串池长度 保留
+_COLUMNS = (("type_ids", "H"), ("kind_ids", "B"), ("lines", "I"), ("lexeme_ids", "I"))
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class TokenStore:
+    """列式Token存储：类型编号、行号、种类编号与驻留的词素表"""
+
+    def __init__(self):
+        self.type_ids = array("H")
+        self.lines = array("I")
+        self.kind_ids = array("B")
+        self.lexeme_ids = array("I")
+        self.types = Interner(TOKEN_TYPES)
+        self.kinds = Interner(TOKEN_KINDS)
+        self.lexemes = Interner()
+        self.type_names = self.types.names
+
+    def __len__(self):
+        return len(self.type_ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """释放存储占用的外部资源，内存中的存储无需释放"""
+
+    def append(self, line, kind, sem):
+        """追加一个Token（字段与.tk行拆分后一致），返回其下标"""
+        sem = str(sem)
+        token_type = kind if kind in _SEM_TYPED_KINDS else sem
+        self.type_ids.append(self.types.intern(token_type))
+        self.lines.append(int(line))
+        self.kind_ids.append(self.kinds.intern(kind))
+        self.lexeme_ids.append(self.lexemes.intern(sem))
+        return len(self.type_ids) - 1
+
+    def type_of(self, idx):
+        return self.type_names[self.type_ids[idx]]
+
+    def line(self, idx):
+        return self.lines[idx]
+
+    def kind(self, idx):
+        return self.kinds.names[self.kind_ids[idx]]
+
+    def lexeme(self, idx):
+        return self.lexemes.names[self.lexeme_ids[idx]]
+
+    def entry(self, idx):
+        """与.tk行拆分结果同形的(行号, 种类, 词素)"""
+        return (self.lines[idx], self.kind(idx), self.lexeme(idx))
+
+    def dump(self, file):
+        """以.tk文本格式输出，用于调试查看二进制Token文件"""
+        for idx in range(len(self)):
+            file.write(f"{self.lines[idx]} {self.kind(idx)} {self.lexeme(idx)}\n")
+
+    def save(self, path):
+        """写出二进制Token文件"""
+        pools = [
+            "\n".join(interner.names).encode("utf8")
+            for interner in (self.types, self.kinds, self.lexemes)
+        ]
+        header = _HEADER.pack(
+            BINARY_MAGIC,
+            BINARY_VERSION,
+            b"l" if sys.byteorder == "little" else b"b",
+            len(self),
+            *map(len, pools),
+            0,
+        )
+        with open(path, "wb") as f:
+            f.write(header)
+            offset = len(header)
+            for name, _ in _COLUMNS:
+                data = getattr(self, name).tobytes()
+                f.write(bytes(_align(offset) - offset))
+                f.write(data)
+                offset = _align(offset) + len(data)
+            for pool in pools:
+                f.write(pool)
+
+    @classmethod
+    def load(cls, source):
+        """从.tk文本或二进制文件路径、或iter_tokens()产生的Token序列建立存储"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+                    return MappedTokenStore(source)
+        store = cls()
+        if isinstance(source, (str, os.PathLike)):
+            with open(source) as f:
+                for token in f:
+                    store.append(*token.strip().split(" ", 20)[:3])
+        else:
+            for token in source:
+                store.append(*token_entry(token))
+        return store
+
+
+class _MappedColumn:
+    """文件映射上的只读列，追加的Token保存在单独的溢出数组中
+
+    列对象在追加前后保持不变，分析器可以一直持有同一个列对象。
+    """
+
+    __slots__ = ("base", "extra", "count")
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = array(base.format)
+        self.count = len(base)
+
+    def __len__(self):
+        return self.count + len(self.extra)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.tolist()[idx]
+        if idx < 0:
+            idx += len(self)
+        if idx < self.count:
+            return self.base[idx]
+        return self.extra[idx - self.count]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+    def append(self, value):
+        self.extra.append(value)
+
+    def tolist(self):
+        return self.base.tolist() + self.extra.tolist()
+
+    def tobytes(self):
+        return self.base.tobytes() + self.extra.tobytes()
+
+
+class MappedTokenStore(TokenStore):
+    """通过mmap直接读取二进制Token文件，各列为文件映射上的只读视图
+
+    用完后调用close()（或使用with语句）关闭映射。
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order, count, *pool_sizes, _ = _HEADER.unpack_from(self._map)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{path}: unsupported token file")
+        if order != (b"l" if sys.byteorder == "little" else b"b"):
+            raise ValueError(f"{path}: token file byte order mismatch")
+
+        offset = _HEADER.size
+        with memoryview(self._map) as view:
+            for name, code in _COLUMNS:
+                offset = _align(offset)
+                size = count * array(code).itemsize
+                column = view[offset : offset + size].cast(code)
+                setattr(self, name, _MappedColumn(column))
+                offset += size
+
+        pools = []
+        for size in pool_sizes:
+            pools.append(Interner(self._decode_pool(offset, size)))
+            offset += size
+        self.types, self.kinds, self.lexemes = pools
+        self.type_names = self.types.names
+
+    def _decode_pool(self, offset, size):
+        if size == 0:
+            return []
+        return self._map[offset : offset + size].decode("utf8").split("\n")
+
+    def close(self):
+        """释放各列的视图并关闭文件映射，之后不能再读取Token"""
+        if self._map.closed:
+            return
+        for name, _ in _COLUMNS:
+            getattr(self, name).base.release()
+        self._map.close()
+
+
+class TokenCursor:
+    """以栈接口遍历TokenStore：元素为Token下标，压回的Token保存在覆盖栈中"""
+
+    def __init__(self, store, pos=0):
+        self.store = store
+        self.pos = pos
+        # 之后追加到存储中的Token（如错误修复插入的Token）不属于输入
+        self.end = len(store)
+        self.overlay = []
+
+    def isEmpty(self):
+        return not self.overlay and self.pos >= self.end
+
+    def push(self, idx):
+        self.overlay.append(idx)
+
+    def pop(self):
+        if self.overlay:
+            return self.overlay.pop()
+        if self.pos >= self.end:
+            return self._empty()
+        self.pos += 1
+        return self.pos - 1
+
+    def top(self):
+        if self.overlay:
+            return self.overlay[-1]
+        if self.pos >= self.end:
+            return self._empty()
+        return self.pos
+
+    def size(self):
+        return len(self.overlay) + self.end - self.pos
+
+    def _empty(self):
+        print("语法树生成有误")
+        sys.exit()
+
+    def fork(self):
+        # 存储本身只读共享，复制游标只需复制位置与覆盖栈
+        clone = copy.copy(self)
+        clone.overlay = list(self.overlay)
+        return clone
@@ -0,0 +1,315 @@
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import LexicalaAnalyzer
+from GrammarProcess import NO_OP, predict1
+from LL1 import LL1
+from ParseEvents import ParseHandler
+from recursion import PARSERS
+from SemanticAnalysis import generate_node, semantic
+from TokenStore import TokenStore
+
+GRAMMAR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data/grammar.txt")
+
+PROC_TEMPLATE = """
+    procedure p{n}(integer x; var integer y);
+        var integer t, k;
+            arr c;
+        begin
+            t := x * 2 + (y - 1) / 3 - k;
+            c[1] := t;
+            if t < 10 then
+                y := t
+            else
+                y := t - 10 * (x + c[1])
+            fi;
+            while k < 5 do
+                read(k);
+                k := k + 1
+            endwh;
+            write(y)
+        end
+"""
+
+
+def scaled_source(procs):
+    """生成含procs个过程的合法SNL程序，用于放大输入规模"""
+    parts = [
+        "program bench\n",
+        "    type arr = array [1..10] of integer;\n",
+        "    var integer i, s;\n        arr a;\n",
+    ]
+    parts.extend(PROC_TEMPLATE.format(n=n) for n in range(procs))
+    parts.append("begin\n    read(i);\n")
+    parts.extend(f"    p{n}(i + {n}, s);\n" for n in range(procs))
+    parts.append("    write(s)\nend.\n")
+    return "".join(parts)
+
+
+def timed(func, repeat=3):
+    """返回func多次运行中的最短耗时与最后一次的结果"""
+    best, result = None, None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                result = func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_lex(procs):
+    """比较各词法分析引擎的吞吐量（tokens/sec）"""
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    print(f"lex: {len(lines)} lines")
+    baseline = None
+    for name, engine in LexicalaAnalyzer.ENGINES.items():
+
+        def run():
+            LexicalaAnalyzer.init()
+            return list(engine(lines))
+
+        elapsed, result = timed(run)
+        tokens = [(x.line, x.lex, x.sem) for x in result]
+        if baseline is None:
+            baseline = tokens
+        elif tokens != baseline:
+            print(f"  {name}: token stream differs from baseline")
+        print(f"  {name:>8}: {len(tokens) / elapsed:12.0f} tokens/sec")
+
+
+def bench_tokens(procs):
+    """比较文本与二进制Token文件的读取耗时（含遍历全部Token类型）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "bench.snl")
+        with open(src, "w") as f:
+            f.write(scaled_source(procs))
+        for fmt, binary in (("text", False), ("binary", True)):
+            path = os.path.join(tmp, f"bench.{fmt}")
+            with redirect_stdout(io.StringIO()):
+                LexicalaAnalyzer.lex(src, path, binary=binary)
+
+            def run():
+                store = TokenStore.load(path)
+                for idx in range(len(store)):
+                    store.type_ids[idx]
+                return store
+
+            elapsed, store = timed(run)
+            size = os.path.getsize(path)
+            count = len(store)
+            store.close()
+            print(f"{fmt:>8}: {elapsed * 1000:8.1f} ms, {size} bytes, {count} tokens")
+
+
+def bench_parse(procs):
+    """LL1分析的吞吐量（tokens/sec），run含语法树生成与输出，check只检查语法"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_path = os.path.join(tmp, "bench.ast")
+        for mode in ("run", "check"):
+
+            def run():
+                parser = LL1(GRAMMAR, store, tree_path)
+                getattr(parser, mode)()
+                return parser
+
+            elapsed, parser = timed(run)
+            rate = len(store) / elapsed
+            print(f"{mode:>8}: {rate:12.0f} tokens/sec, {len(store)} tokens")
+    table = parser.tables.table
+    print(f"table: {len(table) * table.itemsize} bytes")
+
+
+def bench_write(procs):
+    """语法树输出的吞吐量（lines/sec），分别写入文件与内存"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_path = os.path.join(tmp, "bench.ast")
+        parser = LL1(GRAMMAR, store, tree_path)
+        parser.run()
+        tree = parser.syntax_tree
+        count = sum(1 for _ in tree.lines())
+        for target in ("file", "memory"):
+
+            def run():
+                tree.getInfNode(tree_path if target == "file" else io.StringIO())
+
+            elapsed, _ = timed(run)
+            print(f"{target:>8}: {count / elapsed:12.0f} lines/sec, {count} lines")
+
+
+def bench_memory(procs):
+    """语法分析的内存峰值：分析结束后一次性输出与增量输出的对比"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_path = os.path.join(tmp, "bench.ast")
+        for name, parser_class in PARSERS.items():
+            for incremental in (False, True):
+                tracemalloc.start()
+                parser_class(GRAMMAR, store, tree_path, incremental=incremental).run()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                mode = "incremental" if incremental else "batch"
+                print(f"{name:>4} {mode:>11}: {peak / 2**20:8.1f} MiB peak")
+
+
+def bench_semantic(procs):
+    """语义分析的耗时：全局作用域中有procs个过程，主程序逐个调用"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_path = os.path.join(tmp, "bench.ast")
+        LL1(GRAMMAR, store, tree_path).run()
+        elapsed, result = timed(
+            lambda: semantic(tree_path, os.path.join(tmp, "bench.sem"))
+        )
+    print(f"semantic: {elapsed:8.3f} s, {procs} procedures, result {result}")
+
+
+def bench_load(procs):
+    """语义分析读入.ast的吞吐量（lines/sec）与读入期间除语法树外的内存峰值"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_path = os.path.join(tmp, "bench.ast")
+        LL1(GRAMMAR, store, tree_path).run()
+        with open(tree_path) as file:
+            count = sum(1 for _ in file)
+        elapsed, _ = timed(lambda: generate_node(tree_path))
+        tracemalloc.start()
+        root = generate_node(tree_path)  # 语法树仍被引用，current即为语法树的大小
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"    load: {count / elapsed:12.0f} lines/sec, {count} lines")
+    print(f"overhead: {(peak - current) / 2**20:8.1f} MiB above the tree")
+    print(f"    tree: {current / 2**20:8.1f} MiB, root {root.nodeKind}")
+
+
+def bench_actions(procs):
+    """语义动作的分派开销：逐个调用空动作与按NO_OP标记跳过的对比"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    applied = []
+
+    class Recorder(LL1):
+        def _apply_production(self, prod_id, tree, token, node):
+            applied.append(prod_id + 1)
+            return super()._apply_production(prod_id, tree, token, node)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with redirect_stdout(io.StringIO()):
+            Recorder(GRAMMAR, store, os.path.join(tmp, "bench.ast")).run()
+    no_ops = [num for num in applied if NO_OP[num]]
+
+    def call():
+        for num in no_ops:
+            predict1(num, None, None, None)
+
+    def skip():
+        for num in no_ops:
+            if not NO_OP[num]:
+                predict1(num, None, None, None)
+
+    print(f"actions: {len(applied)} productions applied, {len(no_ops)} no-op")
+    for name, func in (("call", call), ("skip", skip)):
+        elapsed, _ = timed(func)
+        print(f"{name:>8}: {elapsed / len(no_ops) * 1e9:8.1f} ns per no-op production")
+
+
+def bench_parsers(procs):
+    """比较LL1与递归下降分析器的吞吐量（tokens/sec），并核对输出的语法树"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, engine in PARSERS.items():
+            tree_path = os.path.join(tmp, f"{name}.ast")
+
+            def run():
+                parser = engine(GRAMMAR, store, tree_path)
+                parser.run()
+                return parser
+
+            elapsed, _ = timed(run)
+            with open(tree_path) as f:
+                tree = f.read()
+            if baseline is None:
+                baseline = tree
+            elif tree != baseline:
+                print(f"  {name}: syntax tree differs from baseline")
+            print(f"  {name:>8}: {len(store) / elapsed:12.0f} tokens/sec")
+
+
+def bench_events(procs):
+    """事件流的吞吐量（tokens/sec）与处理过程中最深的祖先路径"""
+    LexicalaAnalyzer.init()
+    lines = io.StringIO(scaled_source(procs)).readlines()
+    store = TokenStore.load(LexicalaAnalyzer.work_table(lines))
+
+    class Counter(ParseHandler):
+        def __init__(self):
+            self.depth = self.max_depth = self.count = 0
+
+        def enter(self, name, line):
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            self.count += 1
+
+        def exit(self, name, line):
+            self.depth -= 1
+            self.count += 1
+
+        def token(self, kind, lexeme, line):
+            self.count += 1
+
+    def run():
+        counter = Counter()
+        LL1(GRAMMAR, store, None).stream(counter)
+        return counter
+
+    elapsed, counter = timed(run)
+    print(f"events: {len(store) / elapsed:12.0f} tokens/sec, {counter.count} events")
+    print(f"depth: {counter.max_depth}")
+
+
+BENCHMARKS = {
+    "lex": bench_lex,
+    "tokens": bench_tokens,
+    "parse": bench_parse,
+    "write": bench_write,
+    "memory": bench_memory,
+    "semantic": bench_semantic,
+    "load": bench_load,
+    "actions": bench_actions,
+    "parsers": bench_parsers,
+    "events": bench_events,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [procs]")
+        exit(-1)
+    BENCHMARKS[sys.argv[1]](int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -1,7 +1,8 @@
 import os
 import sys
-from LL1 import LL1
+from recursion import PARSERS
 from LexicalaAnalyzer import lex
+from TokenStore import TokenStore
 
 from SemanticAnalysis import semantic
 
@@ -10,10 +11,26 @@ gram_path = os.path.join(
 )
 
 if __name__ == "__main__":
+    options = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    sys.argv = [arg for arg in sys.argv if not arg.startswith("--")]
     if len(sys.argv) < 3:
-        print("Usage: python main.py [lex] [parse] [semantic] <input>")
+        print(
+            "Usage: python main.py [--binary-tokens] [--recovery=standard|cost|panic]"
+            " [--parser=ll1|rd] [--check] [--incremental] [lex] [parse] [semantic]"
+            " <input>"
+        )
         exit(-1)
 
+    recovery = "standard"
+    parser = "ll1"
+    check = "--check" in options
+    incremental = "--incremental" in options
+    for option in options:
+        if option.startswith("--recovery="):
+            recovery = option.split("=", 1)[1]
+        elif option.startswith("--parser="):
+            parser = option.split("=", 1)[1]
+
     input = sys.argv[-1]
     fnameNoExt, _ = os.path.splitext(input)
 
@@ -27,7 +44,8 @@ if __name__ == "__main__":
     if sys.argv[idx] == "lex":
         idx += 1
         try:
-            if lex(input, outputNames["lex"]) != 0:
+            binary = "--binary-tokens" in options
+            if lex(input, outputNames["lex"], binary=binary) != 0:
                 print("Lexical analysis failed")
                 exit(-1)
         except:
@@ -36,15 +54,28 @@ if __name__ == "__main__":
     if sys.argv[idx] == "parse":
         idx += 1
         try:
-            ll1 = LL1(gram_path, outputNames["lex"], outputNames["parse"])
-            ll1.run()
-            err, _ = ll1.showError(verbose=True)
+            with TokenStore.load(outputNames["lex"]) as tokens:
+                ll1 = PARSERS[parser](
+                    gram_path,
+                    tokens,
+                    outputNames["parse"],
+                    recovery=recovery,
+                    incremental=incremental,
+                )
+                if check:
+                    ll1.check()
+                else:
+                    ll1.run()
+                err, _ = ll1.showError(verbose=True)
             if err != 0:
                 print("Gramma analysis failed")
                 exit(-1)
         except:
             print("Gramma analysis failed")
             exit(-1)
+        if check:
+            # 只检查语法时不生成.ast，不能继续语义分析
+            exit(0)
     if sys.argv[idx] == "semantic":
         idx += 1
         try:
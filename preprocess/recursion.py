@@ -1,87 +1,469 @@
-from GrammarError import dealError
-from GrammarProcess import predict1
-from SyntaxTree import Stack, Tree ,Node
-from PredictSetGeneration import GrammarAnalyzer
-
-
-class Rec:
-    def __init__(self, grammar_path, token_path, tree_path):
-        # 数据结构初始化
-        self.grammar = []
-        self.TokenStack = Stack()
-        # 语法分析器初始化
-        analyzer = GrammarAnalyzer()
-        self.predict, self.non_terminals, self.terminals = analyzer.analyze_grammar()
-        self.TreePath = tree_path
-
-        # 加载语法规则
-        with open(grammar_path) as f:
-            lines = f.readlines()
-            for line in lines:
-                parts = line.strip().split(" ", 20)  # 保持最大分割数
-                self.grammar.append({'left': parts[0], 'right': parts[2:]})
-
-        # 加载Token
-        with open(token_path) as f:
-            lines = f.readlines()
-            for token in reversed(lines):
-                parts = token.strip().split(" ", 20)  # 保持最大分割数
-                self.TokenStack.push(parts)
-
-        # 预测表构建
-        self.non_term_map, self.predict_table = self._build_predict_table()
-
-
-    def _build_predict_table(self):
-        #构造LL1分析表
-        non_term_map = {}
-        predict_table = []
-        current_row = 0
-
-        for idx, rule in enumerate(self.grammar):
-            left = rule['left']
-
-            if left not in non_term_map:
-                non_term_map[left] = current_row
-                predict_table.append({t: -1 for t in self.terminals})
-                current_row += 1
-
-            row = non_term_map[left]
-            for symbol in self.predict[idx+1]:  # 注意self.predict的起始索引
-                predict_table[row][symbol] = idx
-
-        return non_term_map, predict_table
-    def error(ll, s):
-
-        print(f"line:{ll + 1}  {s}")
-
-    def parse(self):
-        root = self.program()
-        return root
+from operator import countOf
+
+from ExpressionParser import ExpressionError, ExpressionParser
+from GrammarProcess import ACTIONS
+from LL1 import LL1
+from SyntaxTree import Node, Tree
+
+# 多处用到的预测集合（见data/grammar.txt中对应产生式的PREDICT集合）
+TYPE_FIRST = frozenset({"ARRAY", "CHAR", "ID", "INTEGER", "RECORD"})
+STM_END = frozenset({"ELSE", "END", "ENDWH", "FI"})
+EXP_FIRST = frozenset({"(", "CHARC", "ID", "INTC"})
+
+
+class _Fallback(Exception):
+    """递归下降分析遇到语法错误等情况，改由LL1重新分析"""
+
+
+class Rec(LL1):
+    """递归下降语法分析器
+
+    每个非终结符对应一个方法，按前看Token选择产生式，并在展开时调用与LL1
+    相同的语义动作（跳过空动作），因此生成的语法树与LL1完全一致。
+    尾递归的产生式（各种列表）写成循环，表达式由ExpressionParser分析。
+    遇到语法错误、EOF不在末尾或嵌套过深时，整个输入改由LL1重新分析，
+    错误恢复与输出都与LL1相同。
+    """
+
+    def _build_tree(self, output):
+        try:
+            syntax_tree = self._descend(output)
+        except (_Fallback, ExpressionError, RecursionError):
+            if output is not None:
+                # 丢弃增量输出已写入的部分
+                output.seek(0)
+                output.truncate()
+            return super()._build_tree(output)
+        self.run_success = True
+        return syntax_tree
+
+    def _descend(self, output):
+        # 与LL1一致：词素为EOF的Token（含名为EOF的标识符）处分析结束
+        lexeme_ids = self.tokens.lexeme_ids
+        if (
+            len(lexeme_ids) == 0
+            or countOf(lexeme_ids, self.eof_lexeme) != 1
+            or lexeme_ids[-1] != self.eof_lexeme
+        ):
+            raise _Fallback
+        type_names = self.tokens.type_names
+        self.types = [type_names[type_id] for type_id in self.tokens.type_ids]
+        self.pos = 0
+        self.tree = Tree(output)
+        self.node = self.tree.root
+        self.expressions = ExpressionParser(self.tokens, self.types, self.tree)
+        try:
+            self.program()
+        except _Fallback:
+            # 与LL1一致：分析中途遇到EOF时不报错，保留已生成的语法树
+            pass
+        if self.pos != len(self.types) - 1:
+            raise _Fallback  # 出错，或符号栈已空而输入未结束
+        return self.tree
+
+    def _act(self, num):
+        # 展开第num个产生式时的语义动作，参数与LL1相同
+        self.node = ACTIONS[num](self.tree, self.tokens.entry(self.pos), self.node)
+
+    def _match(self, token_type):
+        if self.types[self.pos] != token_type:
+            raise _Fallback
+        self.pos += 1
+
+    def _check(self, token_type):
+        if self.types[self.pos] != token_type:
+            raise _Fallback
+
+    # Program ::= ProgramHead DeclarePart ProgramBody .
     def program(self):
-        head = self.program_head()
-        part = self.program_part()
-        body = self.program_body()
-        root = Node('ProK', judge=True)
-        root.child[0] = head
-        root.child[1] = part
-        root.child[2] = body
-        return root
+        self.program_head()
+        self.declare_part()
+        self.program_body()
+        self._match(".")
+
+    # ProgramHead ::= PROGRAM ProgramName
     def program_head(self):
-        lineinfo = self.TokenStack.pop()
-        tmp = Node('Pheadk',Lineno = lineinfo[0])
-
-        if lineinfo[2] != 'PROGRAM':
-           self.error(lineinfo[0],'missing PROGRAM')
-        lineinfo = self.TokenStack.pop()
-        if(lineinfo[1]=='ID'):
-            tmp.name.append(lineinfo[2])
+        self._check("PROGRAM")
+        self._act(2)
+        self.pos += 1
+        self.program_name()
+
+    # ProgramName ::= ID
+    def program_name(self):
+        self._check("ID")
+        self._act(3)
+        self.pos += 1
+
+    # DeclarePart ::= TypeDec VarDec ProcDec
+    def declare_part(self):
+        self.type_dec()
+        self.var_dec()
+        self.proc_dec()
+
+    # TypeDec ::= NULL | TypeDeclaration
+    def type_dec(self):
+        look = self.types[self.pos]
+        if look == "TYPE":
+            self.type_declaration()
+        elif look not in ("BEGIN", "PROCEDURE", "VAR"):
+            raise _Fallback
+
+    # TypeDeclaration ::= TYPE TypeDecList
+    def type_declaration(self):
+        self._act(7)
+        self.pos += 1
+        self.type_dec_list()
+
+    # TypeDecList ::= TypeId = TypeName ; TypeDecMore
+    # TypeDecMore ::= NULL | TypeDecList
+    def type_dec_list(self):
+        while True:
+            self._check("ID")
+            self._act(8)
+            self._act(11)  # TypeId ::= ID
+            self.pos += 1
+            self._match("=")
+            self.type_name()
+            self._match(";")
+            look = self.types[self.pos]
+            if look in ("BEGIN", "PROCEDURE", "VAR"):
+                self._act(9)
+                return
+            if look != "ID":
+                raise _Fallback
+
+    # TypeName ::= BaseType | StructureType | ID
+    def type_name(self):
+        look = self.types[self.pos]
+        if look in ("INTEGER", "CHAR"):
+            self.base_type()
+        elif look == "ARRAY":
+            self.array_type()
+        elif look == "RECORD":
+            self.rec_type()
+        elif look == "ID":
+            self._act(14)
+            self.pos += 1
+        else:
+            raise _Fallback
+
+    # BaseType ::= INTEGER | CHAR
+    def base_type(self):
+        look = self.types[self.pos]
+        if look == "INTEGER":
+            self._act(15)
+        elif look == "CHAR":
+            self._act(16)
+        else:
+            raise _Fallback
+        self.pos += 1
+
+    # ArrayType ::= ARRAY [ Low .. Top ] OF BaseType
+    def array_type(self):
+        self._act(19)
+        self.pos += 1
+        self._match("[")
+        self._check("INTC")
+        self._act(20)  # Low ::= INTC
+        self.pos += 1
+        self._match("..")
+        self._check("INTC")
+        self._act(21)  # Top ::= INTC
+        self.pos += 1
+        self._match("]")
+        self._match("OF")
+        self.base_type()
+
+    # RecType ::= RECORD FieldDecList END
+    def rec_type(self):
+        self._act(22)
+        self.pos += 1
+        self.field_dec_list()
+        self._match("END")
+
+    # FieldDecList ::= BaseType IdList ; FieldDecMore | ArrayType IdList ; FieldDecMore
+    # FieldDecMore ::= NULL | FieldDecList
+    def field_dec_list(self):
+        while True:
+            look = self.types[self.pos]
+            if look in ("INTEGER", "CHAR"):
+                self._act(23)
+                self.base_type()
+            elif look == "ARRAY":
+                self._act(24)
+                self.array_type()
+            else:
+                raise _Fallback
+            self.id_list()
+            self._match(";")
+            look = self.types[self.pos]
+            if look == "END":
+                self._act(25)
+                return
+            if look not in ("ARRAY", "CHAR", "INTEGER"):
+                raise _Fallback
+
+    # IdList ::= ID IdMore
+    # IdMore ::= NULL | , IdList
+    def id_list(self):
+        while True:
+            self._check("ID")
+            self._act(27)
+            self.pos += 1
+            look = self.types[self.pos]
+            if look == ";":
+                return
+            if look != ",":
+                raise _Fallback
+            self.pos += 1
+
+    # VarDec ::= NULL | VarDeclaration
+    def var_dec(self):
+        look = self.types[self.pos]
+        if look == "VAR":
+            self.var_declaration()
+        elif look not in ("BEGIN", "PROCEDURE"):
+            raise _Fallback
+
+    # VarDeclaration ::= VAR VarDecList
+    def var_declaration(self):
+        self._act(32)
+        self.pos += 1
+        self.var_dec_list()
+
+    # VarDecList ::= TypeName VarIdList ; VarDecMore
+    # VarDecMore ::= NULL | VarDecList
+    def var_dec_list(self):
+        while True:
+            if self.types[self.pos] not in TYPE_FIRST:
+                raise _Fallback
+            self._act(33)
+            self.type_name()
+            self.var_id_list()
+            self._match(";")
+            look = self.types[self.pos]
+            if look in ("BEGIN", "PROCEDURE"):
+                self._act(34)
+                return
+            if look not in TYPE_FIRST:
+                raise _Fallback
+
+    # VarIdList ::= ID VarIdMore
+    # VarIdMore ::= NULL | , VarIdList
+    def var_id_list(self):
+        while True:
+            self._check("ID")
+            self._act(36)
+            self.pos += 1
+            look = self.types[self.pos]
+            if look == ";":
+                return
+            if look != ",":
+                raise _Fallback
+            self.pos += 1
+
+    # ProcDec ::= NULL | ProcDeclaration
+    # ProcDecMore ::= NULL | ProcDeclaration
+    def proc_dec(self):
+        while True:
+            look = self.types[self.pos]
+            if look == "BEGIN":
+                return
+            if look != "PROCEDURE":
+                raise _Fallback
+            self.proc_declaration()
+
+    # ProcDeclaration ::= PROCEDURE ProcName ( ParamList ) ;
+    #                     ProcDecPart ProcBody ProcDecMore
+    # ProcDecMore由proc_dec的循环处理
+    def proc_declaration(self):
+        self._act(41)
+        self.pos += 1
+        self._check("ID")
+        self._act(44)  # ProcName ::= ID
+        self.pos += 1
+        self._match("(")
+        self.param_list()
+        self._match(")")
+        self._match(";")
+        self.declare_part()  # ProcDecPart ::= DeclarePart
+        self.program_body()  # ProcBody ::= ProgramBody
+
+    # ParamList ::= NULL | ParamDecList
+    # ParamDecList ::= Param ParamMore
+    # ParamMore ::= NULL | ; ParamDecList
+    def param_list(self):
+        if self.types[self.pos] == ")":
+            self._act(45)
+            return
+        while True:
+            self.param()
+            look = self.types[self.pos]
+            if look == ")":
+                self._act(48)
+                return
+            if look != ";":
+                raise _Fallback
+            self.pos += 1
+
+    # Param ::= TypeName FormList | VAR TypeName FormList
+    def param(self):
+        look = self.types[self.pos]
+        if look in TYPE_FIRST:
+            self._act(50)
+        elif look == "VAR":
+            self._act(51)
+            self.pos += 1
         else:
-            self.error(lineinfo[0],'missing program_name')
-        lineinfo = self.TokenStack.pop()
-        return tmp
-    def declare_part():
-        type_t=init_node();type_t->nodekind=TypeK;type_t->child[0]=TypeDec();
-
-rec = Rec("data/grammar.txt", "data/testtoken.txt","data/test.txt")
-rec.program()
+            raise _Fallback
+        self.type_name()
+        self.form_list()
+
+    # FormList ::= ID FidMore
+    # FidMore ::= NULL | , FormList
+    def form_list(self):
+        while True:
+            self._check("ID")
+            self._act(52)
+            self.pos += 1
+            look = self.types[self.pos]
+            if look in (")", ";"):
+                return
+            if look != ",":
+                raise _Fallback
+            self.pos += 1
+
+    # ProgramBody ::= BEGIN StmList END
+    def program_body(self):
+        self._check("BEGIN")
+        self._act(57)
+        self.pos += 1
+        self.stm_list()
+        self._match("END")
+
+    # StmList ::= Stm StmMore
+    # StmMore ::= NULL | ; StmList
+    def stm_list(self):
+        while True:
+            self.stm()
+            look = self.types[self.pos]
+            if look in STM_END:
+                self._act(59)
+                return
+            if look != ";":
+                raise _Fallback
+            self.pos += 1
+
+    # Stm ::= ConditionalStm | LoopStm | InputStm | OutputStm | ReturnStm | ID AssCall
+    def stm(self):
+        look = self.types[self.pos]
+        if look == "ID":
+            self._act(66)
+            self.pos += 1
+            self.ass_call()
+        elif look == "IF":
+            self._act(61)
+            self.conditional_stm()
+        elif look == "WHILE":
+            self._act(62)
+            self.loop_stm()
+        elif look == "READ":
+            self._act(63)
+            self.input_stm()
+        elif look == "WRITE":
+            self._act(64)
+            self.output_stm()
+        elif look == "RETURN":
+            self._act(65)
+            self.pos += 1  # ReturnStm ::= RETURN
+        else:
+            raise _Fallback
+
+    # AssCall ::= AssignmentRest | CallStmRest
+    def ass_call(self):
+        look = self.types[self.pos]
+        if look in (":=", "[", "."):
+            self._act(67)
+            self.assignment_rest()
+        elif look == "(":
+            self._act(68)
+            self.call_stm_rest()
+        else:
+            raise _Fallback
+
+    # AssignmentRest ::= VariMore := Exp
+    def assignment_rest(self):
+        # process69：右侧表达式的占位节点入语法树栈
+        stm = self.node
+        stm.child.append(Node("ExpK"))
+        self.tree.stack.push(stm.child[1])
+        self.node = stm.child[0]
+        self.pos = self.expressions.variable_more(self.pos, self.node)
+        self._match(":=")
+        self.node, self.pos = self.expressions.parse(self.pos)
+
+    # ConditionalStm ::= IF RelExp THEN StmList ELSE StmList FI
+    def conditional_stm(self):
+        self._act(70)
+        self.pos += 1
+        self.node, self.pos = self.expressions.parse_relation(self.pos)
+        self._match("THEN")
+        self.stm_list()
+        self._match("ELSE")
+        self.stm_list()
+        self._match("FI")
+
+    # LoopStm ::= WHILE RelExp DO StmList ENDWH
+    def loop_stm(self):
+        self._act(71)
+        self.pos += 1
+        self.node, self.pos = self.expressions.parse_relation(self.pos)
+        self._match("DO")
+        self.stm_list()
+        self._match("ENDWH")
+
+    # InputStm ::= READ ( Invar )
+    def input_stm(self):
+        self.pos += 1
+        self._match("(")
+        self._check("ID")
+        self._act(73)  # Invar ::= ID
+        self.pos += 1
+        self._match(")")
+
+    # OutputStm ::= WRITE ( Exp )
+    def output_stm(self):
+        # process74：表达式的占位节点入语法树栈
+        self.node.child.append(Node("ExpK"))
+        self.tree.stack.push(self.node.child[0])
+        self.pos += 1
+        self._match("(")
+        self.node, self.pos = self.expressions.parse(self.pos)
+        self._match(")")
+
+    # CallStmRest ::= ( ActParamList )
+    # ActParamList ::= NULL | Exp ActParamMore
+    # ActParamMore ::= NULL | , ActParamList
+    def call_stm_rest(self):
+        self._act(76)
+        self.pos += 1
+        while True:
+            look = self.types[self.pos]
+            if look == ")":
+                self._act(77)
+                break
+            if look not in EXP_FIRST:
+                raise _Fallback
+            self.node, self.pos = self.expressions.parse(self.pos)
+            look = self.types[self.pos]
+            if look == ")":
+                break
+            if look != ",":
+                raise _Fallback
+            self._act(80)
+            self.pos += 1
+        self.pos += 1
+
+
+# 可选的语法分析器
+PARSERS = {"ll1": LL1, "rd": Rec}
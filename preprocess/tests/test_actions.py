@@ -0,0 +1,17 @@
+"""GrammarProcess中的空动作表"""
+
+import pytest
+
+from GrammarProcess import ACTIONS, NO_OP, NO_OP_ACTIONS
+
+
+@pytest.mark.parametrize("num", sorted(NO_OP_ACTIONS))
+def test_no_op_action_keeps_node(num):
+    # 空动作不访问语法树与Token，原样返回当前节点
+    node = object()
+    assert ACTIONS[num](None, None, node) is node
+
+
+def test_no_op_flags():
+    skipped = [num for num, skip in enumerate(NO_OP) if skip]
+    assert skipped == [0, *sorted(NO_OP_ACTIONS)]
@@ -0,0 +1,51 @@
+"""只检查语法的check()：不生成语法树、不写.ast"""
+
+import pytest
+
+import SyntaxTree
+from LexicalaAnalyzer import lex
+from LL1 import LL1
+from main import gram_path
+
+SOURCES = {
+    "valid": """program p
+    var integer i;
+    begin
+        i := (1 + 2) * 3;
+        write(i)
+    end.
+""",
+    "error": """program p
+    var integer i;
+    begin
+        i := 1
+        i := 2;
+        write(i
+    end.
+""",
+}
+
+
+def forbid(*args, **kwargs):
+    raise AssertionError("check() must not build a syntax tree")
+
+
+@pytest.mark.parametrize("name", sorted(SOURCES))
+def test_check_builds_no_tree(tmp_path, monkeypatch, name):
+    source = tmp_path / f"{name}.snl"
+    source.write_text(SOURCES[name])
+    token_path = str(tmp_path / f"{name}.tk")
+    lex(str(source), token_path)
+
+    expected = LL1(gram_path, token_path, str(tmp_path / "run.ast"))
+    expected.run()
+
+    tree_path = tmp_path / "check.ast"
+    analyzer = LL1(gram_path, token_path, str(tree_path))
+    monkeypatch.setattr(SyntaxTree.Node, "__init__", forbid)
+    monkeypatch.setattr(SyntaxTree.Tree, "__init__", forbid)
+    analyzer.check()
+
+    assert not tree_path.exists()
+    assert analyzer.errors == expected.errors
+    assert analyzer.run_success == expected.run_success
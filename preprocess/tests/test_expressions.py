@@ -0,0 +1,77 @@
+"""表达式子树由ExpressionParser生成，LL1与递归下降分析结果一致"""
+
+import os
+
+import pytest
+
+from LexicalaAnalyzer import lex
+from LL1 import LL1
+from main import gram_path
+from recursion import Rec
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ENGINES = {"ll1": LL1, "rd": Rec}
+
+PROGRAM = """program p
+    var integer i;
+        array [1..9] of integer a;
+    begin
+        {}
+    end.
+"""
+
+
+def parse(tmp_path, engine, source):
+    source_path = tmp_path / f"{engine}.snl"
+    source_path.write_text(source)
+    token_path = str(tmp_path / f"{engine}.tk")
+    tree_path = tmp_path / f"{engine}.ast"
+    lex(str(source_path), token_path)
+    analyzer = ENGINES[engine](gram_path, token_path, str(tree_path))
+    analyzer.run()
+    assert analyzer.run_success and not analyzer.errors
+    return tree_path.read_text()
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_expressions_match_reference(tmp_path, engine):
+    # 长运算符链、深层括号嵌套、下标与域变量，参考语法树由原先的
+    # 操作数栈、操作符栈实现生成
+    with open(os.path.join(DATA, "expressions.snl")) as f:
+        source = f.read()
+    with open(os.path.join(DATA, "expressions.ast")) as f:
+        expected = f.read()
+    assert parse(tmp_path, engine, source) == expected
+
+
+def test_deep_parentheses(tmp_path):
+    depth = 1500
+    statement = "i := " + "(" * depth + "i + 1" + ") * 2" * depth
+    source = PROGRAM.format(statement)
+    trees = [parse(tmp_path, engine, source) for engine in sorted(ENGINES)]
+    assert trees[0] == trees[1]
+    assert trees[0].count("OpK *") == depth
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_indexed_relation_left(tmp_path, engine):
+    # 条件表达式左侧含嵌套下标时，原先的操作数栈实现生成空的比较节点，
+    # 并丢失then分支
+    source = PROGRAM.format("if a[a[1]] < i then i := 1 else i := 2 fi")
+    expected = """\
+      StmtK 4 IfK
+         ExpK 4 OpK <
+            ExpK 4 IdK ArrayMembV a
+               ExpK 4 IdK ArrayMembV a
+                  ExpK 4 ConstK 1
+            ExpK 4 IdK IdV i
+      StmLK 4
+         StmtK 4 AssignK
+            ExpK 4 IdK IdV i
+            ExpK 4 ConstK 1
+      StmLK 4
+         StmtK 4 AssignK
+            ExpK 4 IdK IdV i
+            ExpK 4 ConstK 2
+"""
+    assert expected in parse(tmp_path, engine, source)
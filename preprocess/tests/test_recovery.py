@@ -0,0 +1,87 @@
+"""run模式下错误恢复后仍能输出全部错误"""
+
+import pytest
+
+from LexicalaAnalyzer import lex
+from LL1 import LL1
+from main import gram_path
+
+# 恢复后语法树栈与符号栈不再对应的输入，曾在建树时退出而不输出错误
+SOURCES = {
+    "cost": """program p
+    var integer i;
+    begin
+        q(i) if
+        q(i;
+        read(i);
+        write(i)
+    end.
+""",
+    "panic": """program p
+    var integer i;
+    begin
+        i := 1;
+        while i < (= i + 1) do
+            i := i + 1
+        endwh;
+        write(i)
+    end.
+""",
+    # 表达式中出错，恢复后原先仍在建树，由表达式动作退出
+    "standard": """program p
+    var integer i;
+    begin
+        i := 1;
+        while i < (= i + 1) do
+            i := i + 1
+        endwh;
+        write(i)
+    end.
+""",
+}
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("recovery", sorted(SOURCES))
+def test_run_reports_errors(tmp_path, capsys, recovery, incremental):
+    source = tmp_path / "error.snl"
+    source.write_text(SOURCES[recovery])
+    lex(str(source), str(tmp_path / "error.tk"))
+
+    expected = LL1(gram_path, str(tmp_path / "error.tk"), None, recovery=recovery)
+    expected.check()
+    assert expected.errors
+
+    analyzer = LL1(
+        gram_path,
+        str(tmp_path / "error.tk"),
+        str(tmp_path / "error.ast"),
+        recovery=recovery,
+        incremental=incremental,
+    )
+    analyzer.run()
+    # 恢复后停止建树，不完整的语法树不写入.ast
+    assert not analyzer.tree_complete
+    assert not (tmp_path / "error.ast").exists()
+    assert not (tmp_path / "error.ast.part").exists()
+    capsys.readouterr()
+    assert analyzer.showError(verbose=True) == (-1, expected.errors)
+    out = capsys.readouterr().out
+    for error in expected.errors:
+        assert f"line:{error['line']} {error['message']}" in out
+
+
+def test_panic_removes_stale_tree(tmp_path):
+    # 先前成功生成的.ast在再次分析出错并停止建树后被删除，不会被语义分析读到
+    source = tmp_path / "error.snl"
+    source.write_text(SOURCES["panic"])
+    lex(str(source), str(tmp_path / "error.tk"))
+    tree_path = tmp_path / "error.ast"
+    tree_path.write_text("stale\n")
+
+    analyzer = LL1(
+        gram_path, str(tmp_path / "error.tk"), str(tree_path), recovery="panic"
+    )
+    analyzer.run()
+    assert analyzer.errors
+    assert not tree_path.exists()
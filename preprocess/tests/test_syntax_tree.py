@@ -0,0 +1,31 @@
+"""语法树的增量输出"""
+
+import io
+
+from SyntaxTree import Node, Tree
+
+
+def test_emit_before_gives_up_after_miss(monkeypatch):
+    output = io.StringIO()
+    tree = Tree(output)
+    expected = "\n".join(tree.lines()) + "\n"
+    rendered = []
+    node_line = Tree._node_line
+
+    def counting_node_line(self, node, indent):
+        rendered.append(node)
+        return node_line(self, node, indent)
+
+    monkeypatch.setattr(Tree, "_node_line", counting_node_line)
+
+    # 不在语法树中的节点：遍历一次后不再尝试增量输出
+    tree.emitBefore(Node("ProcDecK"))
+    assert not tree.emitting
+    count = len(rendered)
+    for _ in range(3):
+        tree.emitBefore(Node("ProcDecK"))
+    assert len(rendered) == count
+    assert output.getvalue() == ""
+
+    tree.flush()
+    assert output.getvalue() == expected
@@ -0,0 +1,43 @@
+"""分析表的磁盘缓存"""
+
+import pickle
+import shutil
+
+import pytest
+
+from PredictSetGeneration import (
+    DEFAULT_GRAMMAR,
+    GrammarTables,
+    _cache_path,
+    load_tables,
+)
+
+
+@pytest.fixture
+def grammar(tmp_path):
+    path = tmp_path / "grammar.txt"
+    shutil.copy(DEFAULT_GRAMMAR, path)
+    return str(path)
+
+
+def test_cache_round_trip(grammar):
+    built = load_tables(grammar)
+    cached = load_tables(grammar)
+    assert cached is not built
+    assert cached.to_data() == built.to_data()
+
+
+def test_cache_holds_plain_data(grammar):
+    load_tables(grammar)
+    with open(_cache_path(grammar), "rb") as f:
+        _, data = pickle.load(f)
+    assert set(data) == set(GrammarTables.FIELDS)
+    assert not any(isinstance(value, GrammarTables) for value in data.values())
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", pickle.dumps(("x", {}))])
+def test_broken_or_stale_cache_is_rebuilt(grammar, content):
+    expected = load_tables(grammar).to_data()
+    with open(_cache_path(grammar), "wb") as f:
+        f.write(content)
+    assert load_tables(grammar).to_data() == expected
@@ -0,0 +1,74 @@
+"""二进制Token文件（--binary-tokens）的读取与错误恢复"""
+
+import pytest
+
+from LexicalaAnalyzer import lex
+from LL1 import LL1
+from main import gram_path
+from recursion import Rec
+from TokenStore import MappedTokenStore, TokenStore
+
+# 第二条语句前缺少分号，错误恢复会向Token存储中插入Token
+SOURCE = """program p
+    var integer i, j;
+    begin
+        i := 1
+        j := 2;
+        write(i)
+    end.
+"""
+
+
+def lex_source(tmp_path, binary):
+    source = tmp_path / "error.snl"
+    source.write_text(SOURCE)
+    path = tmp_path / ("error.tkb" if binary else "error.tk")
+    lex(str(source), str(path), binary=binary)
+    return path
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    return lex_source(tmp_path, binary=True)
+
+
+@pytest.fixture
+def expected(tmp_path):
+    # 同一程序的文本.tk的分析结果
+    with TokenStore.load(lex_source(tmp_path, binary=False)) as tokens:
+        analyzer = LL1(gram_path, tokens, str(tmp_path / "text.ast"))
+        analyzer.check()
+        return analyzer.showError()
+
+
+def parse(token_file, tmp_path, parser=LL1, mode="run"):
+    with TokenStore.load(token_file) as tokens:
+        assert isinstance(tokens, MappedTokenStore)
+        analyzer = parser(gram_path, tokens, str(tmp_path / "error.ast"))
+        if mode == "events":
+            for _ in analyzer.events():
+                pass
+        else:
+            getattr(analyzer, mode)()
+        return analyzer.showError()
+
+
+@pytest.mark.parametrize("mode", ["run", "check", "events"])
+def test_error_recovery_on_binary_tokens(token_file, tmp_path, expected, mode):
+    assert expected[0] == -1
+    assert parse(token_file, tmp_path, mode=mode) == expected
+
+
+def test_rd_fallback_on_binary_tokens(token_file, tmp_path, expected):
+    assert parse(token_file, tmp_path, parser=Rec) == expected
+
+
+def test_append_keeps_columns(token_file):
+    with TokenStore.load(token_file) as tokens:
+        columns = tokens.type_ids, tokens.lines, tokens.lexeme_ids
+        count = len(tokens)
+        token = tokens.append(7, "ID", "x")
+        assert token == count
+        assert (tokens.type_ids, tokens.lines, tokens.lexeme_ids) == columns
+        assert tokens.lines[token] == tokens.lines[-1] == 7
+        assert tokens.lexeme(token) == "x"